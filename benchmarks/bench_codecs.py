@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage save and reload throughput for each JSON codec,
+and for the binary (msgpack) snapshot format when msgpack is installed.
+
+Usage: ./benchmarks/bench_codecs.py [<number of objects>]
+
+A synthetic store of Places, Reviews and Users is saved and reloaded once
+per codec installed, then in the binary format. Every save serializes
+every object (the fragment cache is dropped first), and reloads go through
+the codec in one go.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import storage  # noqa: E402
+from models.engine import codec  # noqa: E402
+from models.place import Place  # noqa: E402
+from models.review import Review  # noqa: E402
+from models.user import User  # noqa: E402
+
+
+def populate(count):
+    """Fills storage with count synthetic objects"""
+    storage.all().clear()
+    for i in range(count):
+        if i % 3 == 0:
+            obj = Place(name=f"Place {i}", city_id="c", user_id="u",
+                        number_rooms=i % 5, price_by_night=i % 300,
+                        latitude=37.77, longitude=-122.43)
+        elif i % 3 == 1:
+            obj = Review(text=f"Review number {i}", place_id="p",
+                         user_id="u")
+        else:
+            obj = User(email=f"user{i}@hbnb.io", password="pwd",
+                       first_name="Betty", last_name="Holberton")
+        storage.new(obj)
+
+
+def main(count):
+    """Times save and reload of count objects with every codec"""
+    directory = tempfile.mkdtemp()
+    path = os.path.join(directory, 'file.json')
+    storage._FileStorage__file_path = path
+    storage._FileStorage__stream_size = float('inf')
+    populate(count)
+    print(f"{count} objects")
+    formats = [('json', name) for name in codec.available()]
+    try:
+        import msgpack  # noqa: F401
+        formats.append(('msgpack', codec.available()[0]))
+    except ImportError:
+        pass
+    for file_format, name in formats:
+        storage._FileStorage__format = file_format
+        storage._FileStorage__codec = codec.get_codec(name)
+        storage._FileStorage__fragments.clear()
+        start = time.perf_counter()
+        storage.save()
+        saved = time.perf_counter() - start
+        snapshot = os.path.join(directory, 'file.' + file_format)
+        size = os.path.getsize(snapshot)
+
+        objects = dict(storage.all())
+        storage.all().clear()
+        start = time.perf_counter()
+        storage.reload()
+        loaded = time.perf_counter() - start
+        storage.all().clear()
+        storage.all().update(objects)
+        if file_format == 'msgpack':
+            name = 'msgpack'
+            os.remove(snapshot)
+
+        print(f"{name:>7}: save {saved:.3f}s ({count / saved:,.0f} obj/s), "
+              f"reload {loaded:.3f}s ({count / loaded:,.0f} obj/s), "
+              f"{size / 2 ** 20:.1f} MiB")
+    os.remove(path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
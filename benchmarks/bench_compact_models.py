@@ -0,0 +1,60 @@
+#!/usr/bin/python3
+"""
+Benchmark of the memory taken by loaded objects, as built by the models and
+by their compact (slotted) classes, i.e. without and with HBNB_FILE_COMPACT.
+
+Usage: ./benchmarks/bench_compact_models.py [<number of objects>]
+
+Reviews are rebuilt from JSON records, as reload() does, and measured once
+the records are freed. Their place_id and user_id values repeat over 1000
+places and users.
+"""
+import gc
+import json
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models.compact import compact  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def dump(count):
+    """Returns the JSON of count Review records"""
+    places = [Review().id for _ in range(1000)]
+    users = [Review().id for _ in range(1000)]
+    return json.dumps([Review(text=f"Review number {i}",
+                              place_id=places[i % 1000],
+                              user_id=users[i * 7 % 1000]).to_dict()
+                       for i in range(count)])
+
+
+def measure(cls, text):
+    """
+    Returns the bytes per object left allocated by parsing text and
+    building objects of cls from its records, once the records are freed.
+    """
+    gc.collect()
+    tracemalloc.start()
+    values = json.loads(text)
+    objects = [cls(**value) for value in values]
+    assert str(objects[0]) == str(Review(**values[0]))
+    del values
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return size / len(objects)
+
+
+def main(count):
+    """Compares the memory per object of Review and its compact class"""
+    text = dump(count)
+    print(f"{count} Reviews")
+    for name, cls in (('model', Review), ('compact', compact(Review))):
+        print(f"{name:>8}: {measure(cls, text):,.0f} bytes/object")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
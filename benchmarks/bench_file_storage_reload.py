@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage.reload(), building models with from_record(), as
+reload() does, and with Model(**record), as it did before.
+
+Usage: ./benchmarks/bench_file_storage_reload.py [<number of objects>]
+
+from_record() makes the record the model's __dict__ and leaves timestamps
+unparsed, where __init__ sets every key and parses both timestamps.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import storage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def main(count):
+    """Saves count Reviews and times reloads of them"""
+    directory = tempfile.mkdtemp()
+    storage._FileStorage__file_path = os.path.join(directory, 'file.json')
+    storage.all().clear()
+    for i in range(count):
+        storage.new(Review(text=f"Review number {i}",
+                           place_id="p", user_id="u"))
+    storage.save()
+    print(f"{count} objects")
+
+    for name, build in (("Review(**record)", lambda val: Review(**val)),
+                        ("from_record()", Review.from_record)):
+        storage.all().clear()
+        constructors = {'Review': build}
+        storage._FileStorage__constructors = lambda: constructors
+        start = time.perf_counter()
+        storage.reload()
+        print(f"reload, {name + ':':18} {time.perf_counter() - start:.3f}s")
+    del storage._FileStorage__constructors
+    os.remove(storage._FileStorage__file_path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
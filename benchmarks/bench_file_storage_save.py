@@ -0,0 +1,47 @@
+#!/usr/bin/python3
+"""
+Benchmark of FileStorage.save() when a single object out of many is dirty.
+
+Usage: ./benchmarks/bench_file_storage_save.py [<number of objects>]
+
+The first save serializes every object (the cost of every save before
+dirty tracking); the following ones only re-serialize the dirty object and
+splice it with the cached JSON of the clean ones.
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import storage  # noqa: E402
+from models.review import Review  # noqa: E402
+
+
+def main(count):
+    """Fills storage with count Reviews and times full and dirty saves"""
+    directory = tempfile.mkdtemp()
+    storage._FileStorage__file_path = os.path.join(directory, 'file.json')
+    storage.all().clear()
+    for i in range(count):
+        storage.new(Review(text=f"Review number {i}",
+                           place_id="p", user_id="u"))
+    print(f"{count} objects")
+
+    start = time.perf_counter()
+    storage.save()
+    print(f"full save:          {time.perf_counter() - start:.3f}s")
+
+    review = next(iter(storage.all().values()))
+    for _ in range(3):
+        review.text = "Edited"
+        start = time.perf_counter()
+        storage.save()
+        print(f"save with 1 dirty:  {time.perf_counter() - start:.3f}s")
+    os.remove(storage._FileStorage__file_path)
+    os.rmdir(directory)
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
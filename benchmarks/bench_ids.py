@@ -0,0 +1,26 @@
+#!/usr/bin/python3
+"""
+Benchmark of the id generators of the models (see models/ids.py), which
+HBNB_ID_GENERATOR selects.
+
+Usage: ./benchmarks/bench_ids.py [<number of ids>]
+"""
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from models import ids  # noqa: E402
+
+
+def main(count):
+    """Times count ids of every generator"""
+    print(f"{count} ids")
+    for name in ids.available():
+        seconds = timeit.timeit(ids.get_generator(name), number=count)
+        print(f"{name + ':':9} {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000000)
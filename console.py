@@ -263,11 +263,11 @@ class HBNBCommand(cmd.Cmd):  # Implementation of the HBNB console
             print("** instance id missing **")
             return
 
-        key = f"{args[0]}.{args[1]}"  # Generate key: <class name>.<id>
-        try:
-            print(storage.all()[key])
-        except KeyError:
+        instance = storage.get(args[0], args[1])  # Primary key lookup
+        if instance is None:
             print("** no instance found **")
+        else:
+            print(instance)
 
     def help_show(self):
         """ Help information for the show command """
@@ -297,12 +297,12 @@ class HBNBCommand(cmd.Cmd):  # Implementation of the HBNB console
         if len(args) < 2:  # If no id is given
             print("** instance id missing **")
             return
-        key = f"{args[0]}.{args[1]}"  # Generate key: <class name>.<id>
-        try:  # Try to delete object
-            del storage.all()[key]
-            storage.save()
-        except KeyError:  # If instance id is invalid
+        instance = storage.get(args[0], args[1])  # Primary key lookup
+        if instance is None:  # If instance id is invalid
             print("** no instance found **")
+            return
+        storage.delete(instance)
+        storage.save()
 
     def help_destroy(self):
         """ Help information for the destroy command """
@@ -346,11 +346,7 @@ class HBNBCommand(cmd.Cmd):  # Implementation of the HBNB console
                <class name>.count()
         """
         args = args.split()
-        count = 0
-        for instance in storage.all().values():  # Iterate through instances
-            if args[0] == instance.__class__.__name__:  # If class name matches
-                count += 1
-        print(count)
+        print(storage.count(args[0]))  # Index size or SELECT COUNT(*)
 
     def help_count(self):
         """ """
@@ -385,9 +381,8 @@ class HBNBCommand(cmd.Cmd):  # Implementation of the HBNB console
         if len(args) < 2:  # No id provided
             print("** instance id missing **")
             return
-        key = f"{args[0]}.{args[1]}"  # Generate key: <class name>.<id>
-        # determine if key is present
-        if key not in storage.all():
+        current_obj = storage.get(args[0], args[1])  # Get current object
+        if current_obj is None:  # determine if object is present
             print("** no instance found **")
             return
         if len(args) < 3:  # No attribute name provided
@@ -397,7 +392,6 @@ class HBNBCommand(cmd.Cmd):  # Implementation of the HBNB console
             print("** value missing **")
             return
 
-        current_obj = storage.all()[key]  # Get current object
         if args[2] == "id" or args[2] == "created_at" or\
                 args[2] == "updated_at":
             return
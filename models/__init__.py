@@ -6,6 +6,8 @@ from os import getenv
 
 if getenv('HBNB_TYPE_STORAGE') == 'db':  # if storage type is database
     from models.engine.db_storage import DBStorage as Storage
+elif getenv('HBNB_TYPE_STORAGE') == 'asyncdb':  # database, under asyncio
+    from models.engine.async_db_storage import AsyncDBStorage as Storage
 else:
     from models.engine.file_storage import FileStorage as Storage
 
@@ -31,6 +31,6 @@ class Amenity(BaseModel, Base):
     """
     if storage_type == "db":  # In the case that the storage type is a database
         __tablename__ = "amenities"
-        name = Column(String(128), nullable=False)
+        name = Column(String(128), nullable=False, index=True)
     else:  # In the case that the storage type is a JSON file
         name = ""
@@ -4,26 +4,74 @@ This module creates BaseModel class for AirBnB clone project.
 This provides the basic functionality for all other classes.
 
 Dependencies:
-    uuid.uuid4 - generates unique id's for each instance
+    ids - generates unique id's for each instance (HBNB_ID_GENERATOR)
     datetime - provides date and time information
     storage - stores instances of classes
 """
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy import Column, String, DateTime, Integer
-import uuid  # For generating unique id's
 from os import getenv  # For accessing environment variables
 import models
+from models.ids import get_generator  # For generating unique id's
 import datetime
 from datetime import datetime
 
 storage_type = getenv("HBNB_TYPE_STORAGE")
+if storage_type == "asyncdb":  # Same schema, with the asyncio engine
+    storage_type = "db"
 
 Base = object
+new_id = get_generator(getenv("HBNB_ID_GENERATOR"))  # uuid4 by default
 
 if storage_type == "db":  # Checking current storage-type settings
     Base = declarative_base()  # Creating base class for SQLAlchemy.
 
 
+class _Timestamp(datetime):
+    """
+    Datetime parsed from an ISO string, which it keeps in iso so that
+    to_dict() doesn't format it again. It shows as a datetime.
+    """
+    __slots__ = ('iso',)
+
+    def __repr__(self):
+        """Returns the representation of the equal datetime"""
+        return 'datetime.datetime' + \
+            super().__repr__()[len(type(self).__name__):]
+
+
+class _LazyTimestamp:
+    """
+    Timestamp attribute (created_at or updated_at) of models in file storage.
+    Models built by from_record() hold it as its ISO string, which is only
+    parsed into a datetime when the attribute is first read. The string is
+    kept along (see _Timestamp) until the attribute is set again.
+    """
+
+    def __set_name__(self, owner, name):
+        """Records the name of the attribute"""
+        self.name = name
+
+    def __get__(self, obj, owner=None):
+        """Returns the datetime, parsing it if still held as a string"""
+        if obj is None:
+            return self
+        try:
+            value = obj.__dict__[self.name]
+        except KeyError:
+            raise AttributeError(f"'{type(obj).__name__}' object has no "
+                                 f"attribute '{self.name}'") from None
+        if type(value) is str:
+            iso = value
+            value = obj.__dict__[self.name] = _Timestamp.fromisoformat(iso)
+            value.iso = iso
+        return value
+
+    def __set__(self, obj, value):
+        """Sets the timestamp"""
+        obj.__dict__[self.name] = value
+
+
 class BaseModel:
     """
     Base Class for basic functionality for all classes.
@@ -35,6 +83,7 @@ class BaseModel:
 
     Methods:
         __init__ - instantiates a new model
+        from_record - builds a model from a record read by storage
         __str__ - returns a string representation of the instance
         save - updates updated_at with current time when instance is changed
         to_dict - converts instance into dict format
@@ -46,6 +95,9 @@ class BaseModel:
         current_time = datetime.utcnow
         created_at = Column(DateTime, default=current_time)
         updated_at = Column(DateTime, default=current_time)
+    else:  # Parsed on first read when built by from_record()
+        created_at = _LazyTimestamp()
+        updated_at = _LazyTimestamp()
 
     def __init__(self, *args, **kwargs):
         """
@@ -61,7 +113,7 @@ class BaseModel:
         current_time = datetime.now()  # Taking time-stamp for consistency.
         if len(kwargs) == 0:  # If no kwargs were passsed.
             from models import storage
-            self.id = str(uuid.uuid4())  # Generating unique id.
+            self.id = new_id()  # Generating unique id.
             self.created_at = current_time
             self.updated_at = current_time
             storage.new(self)
@@ -70,17 +122,60 @@ class BaseModel:
                 if key != '__class__':  # Ignoring class name.
                     setattr(self, key, value)
             if 'id' not in kwargs.keys():
-                self.id = str(uuid.uuid4())
+                self.id = new_id()
             if 'created_at' not in kwargs.keys():
                 self.created_at = current_time
             else:
-                self.created_at = datetime.fromisoformat(self.created_at)
+                self.created_at = datetime.fromisoformat(kwargs['created_at'])
             if 'updated_at' not in kwargs.keys():
                 self.updated_at = current_time
             else:
-                self.updated_at = datetime.fromisoformat(self.updated_at)
+                self.updated_at = datetime.fromisoformat(kwargs['updated_at'])
         return
 
+    @classmethod
+    def from_record(cls, record):
+        """
+        Builds a model from a record read by storage (a to_dict() dictionary
+        with every attribute), without the checks of __init__: the record
+        becomes the model's __dict__ as it is, and its timestamps are only
+        parsed when read. The record is not to be used afterwards.
+
+        Args:
+            record (dict): The record, e.g. decoded from file.json
+
+        Returns:
+            The model, not added to storage
+        """
+        if storage_type == "db":  # SQLAlchemy must set up the instance
+            return cls(**record)
+        obj = cls.__new__(cls)
+        record.pop('__class__', None)
+        object.__setattr__(obj, '__dict__', record)
+        return obj
+
+    if storage_type != "db":  # SQLAlchemy tracks changes in db storage
+        def __setattr__(self, name, value):
+            """
+            Sets an attribute and notifies file storage, so that its indexes
+            follow changes such as a City moving to another State.
+            """
+            try:
+                old = self.__dict__[name]
+            except KeyError:  # Unset: reads as the class default, e.g. ""
+                old = getattr(type(self), name, None)
+            super().__setattr__(name, value)
+            models.storage.changed(self, name, old)
+
+        def __delattr__(self, name):
+            """
+            Deletes an attribute and notifies file storage, so that the
+            next save writes the object without it.
+            """
+            old = self.__dict__.get(name)
+            super().__delattr__(name)
+            models.storage.changed(self, name, old)
+
     def __str__(self):
         """
         Creates an unofficial string representation of instance.
@@ -90,16 +185,19 @@ class BaseModel:
         Returns:
             Unofficial string representation of instance.
         """
+        self.created_at, self.updated_at  # Parses unread timestamps
         return f"[{self.__class__.__name__}] ({self.id}) {self.__dict__}"
 
     def save(self):
         """
         Updates updated_at with current time when instance is changed.
+        With the asyncio database engine, the returned coroutine is to be
+        awaited: `await obj.save()`.
         """
         from models import storage
         self.updated_at = datetime.now()
         storage.new(self)
-        storage.save()
+        return storage.save()
 
     def to_dict(self):
         """
@@ -114,8 +212,12 @@ class BaseModel:
             Dictionary representation of instance.
         """
         dictionary = self.__dict__.copy()  # Copying to avoid overwriting.
-        # Converting datetime objects to isoformat.
-        dictionary['created_at'] = dictionary['created_at'].isoformat()
-        dictionary['updated_at'] = dictionary['updated_at'].isoformat()
+        # Converting datetime objects to isoformat. Timestamps that were
+        # loaded and not set since are still (or keep) their ISO strings.
+        for name in ('created_at', 'updated_at'):
+            value = dictionary[name]
+            if type(value) is not str:
+                dictionary[name] = getattr(value, 'iso', None) or \
+                    value.isoformat()
         dictionary['__class__'] = self.__class__.__name__  # Adding class name.
         return dictionary
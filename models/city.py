@@ -7,7 +7,7 @@ Dependencies:
     sqlalchemy
     models/base_model.py
 """
-from sqlalchemy import Column, String, ForeignKey
+from sqlalchemy import Column, String, ForeignKey, Index
 from models.base_model import BaseModel, Base, storage_type
 from sqlalchemy.orm import relationship
 
@@ -20,11 +20,15 @@ class City(BaseModel, Base):
 
     Attributes:
         __tablename__ (str): Table name in MySQL database.
+        __table_args__ (tuple): Index of the cities of a state, by name.
         name (sqlalchemy String): City name.
         state_id (sqlalchemy String): State id.
     """
     if storage_type == "db":  # If set storage type is db
         __tablename__ = "cities"  # Table name in MySQL database
+        # Serves state.cities and its sorting by name
+        __table_args__ = (
+            Index("ix_cities_state_id_name", "state_id", "name"),)
         # Setting up schema for sqlalchemy
         name = Column(String(128), nullable=False)
         state_id = Column(String(60), ForeignKey("states.id"), nullable=False)
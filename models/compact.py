@@ -0,0 +1,158 @@
+#!/usr/bin/python3
+"""
+This module generates compact (slotted) classes of the models, which file
+storage builds the objects it loads with when HBNB_FILE_COMPACT is set.
+
+The compact class of a model is a subclass with the same name, whose fields
+(the attributes the model and its parents declare, plus id, created_at and
+updated_at) are kept in __slots__ instead of a per-instance dictionary.
+Unset fields read as the model's class defaults, and attributes the model
+does not declare still go to a dictionary of their own.
+
+__str__ and to_dict() show attributes in the order they were set, which
+slots don't keep, so each object also refers to its shape: the tuple of
+the names it was given, in order. Objects set in the same order share the
+same shape, so a store of them holds each attribute name once. Foreign keys
+(*_id strings), which many objects repeat, are interned as well.
+
+Functions:
+    declared: returns the fields of a model and their class defaults
+    compact: returns the compact class of a model
+"""
+import sys
+from types import MemberDescriptorType
+from functools import lru_cache
+import models
+
+_transitions = {}  # Shape of a shape given one more name: {(shape, name):}
+
+
+def _extend(shape, name):
+    """Returns the shared shape of shape followed by name"""
+    key = (shape, name)
+    extended = _transitions.get(key)
+    if extended is None:
+        extended = _transitions[key] = shape + (sys.intern(name),)
+    return extended
+
+
+class _Compact:
+    """
+    Behavior of the compact classes, which keep their fields in slots.
+
+    Attributes:
+        _defaults (dict): class defaults of the fields, by name
+        _interned (frozenset): fields whose string values are interned
+    """
+    __slots__ = ()
+    _defaults = {}
+    _interned = frozenset()
+
+    def __getattr__(self, name):
+        """Reads unset fields as their class default, and unset shapes as
+        the empty shape"""
+        if name == '_shape':
+            return ()
+        try:
+            return self._defaults[name]
+        except KeyError:
+            raise AttributeError(f"'{type(self).__name__}' object has no "
+                                 f"attribute '{name}'") from None
+
+    def __setattr__(self, name, value):
+        """
+        Sets an attribute, extends the object's shape with it if it is new,
+        and notifies file storage as BaseModel.__setattr__ does. Properties
+        are set through their setter, and are not part of the shape.
+        """
+        descriptor = getattr(type(self), name, None)
+        if hasattr(descriptor, '__set__') and \
+                not isinstance(descriptor, MemberDescriptorType):
+            # e.g. the amenities setter, which sets the fields itself
+            object.__setattr__(self, name, value)
+            return
+        old = getattr(self, name, None)  # The class default if unset
+        shape = self._shape
+        if name not in shape:
+            object.__setattr__(self, '_shape', _extend(shape, name))
+        if name in self._interned and type(value) is str:
+            value = sys.intern(value)
+        object.__setattr__(self, name, value)
+        models.storage.changed(self, name, old)
+
+    def __delattr__(self, name):
+        """Deletes an attribute, drops it from the object's shape, and
+        notifies file storage as BaseModel.__delattr__ does"""
+        old = getattr(self, name, None)
+        object.__delattr__(self, name)
+        shape = ()
+        for kept in self._shape:
+            if kept != name:
+                shape = _extend(shape, kept)
+        object.__setattr__(self, '_shape', shape)
+        models.storage.changed(self, name, old)
+
+    @classmethod
+    def from_record(cls, record):
+        """Builds an object from a record read by storage, through
+        __init__, as slots can't be filled in one go"""
+        return cls(**record)
+
+    @property
+    def __dict__(self):
+        """
+        Returns a new dictionary of the object's attributes, in the order
+        they were set, as the __dict__ of a model object would hold them.
+        It is a copy: writing to it does not change the object.
+        """
+        return {name: getattr(self, name) for name in self._shape}
+
+
+def declared(model):
+    """
+    Returns the fields of a model: id, created_at and updated_at, then the
+    attributes the model and its parents declare, with their defaults.
+
+    Args:
+        model (class): A model class, e.g. Place
+
+    Returns:
+        A dictionary of the class defaults of the fields, by name, in order
+        (None for id, created_at and updated_at)
+    """
+    defaults = dict.fromkeys(('id', 'created_at', 'updated_at'))
+    for cls in reversed(model.__mro__):
+        for name, value in vars(cls).items():
+            if name.startswith('_') or callable(value) or \
+                    hasattr(value, '__get__'):  # e.g. properties
+                continue
+            defaults[name] = value
+    return defaults
+
+
+@lru_cache(maxsize=None)
+def compact(model):
+    """
+    Returns the compact class of a model, built on the first call.
+
+    Args:
+        model (class): A model class, e.g. Place
+
+    Returns:
+        A slotted subclass of model, with the same name
+    """
+    defaults = declared(model)
+    fields = list(defaults)
+    for name in ('id', 'created_at', 'updated_at'):
+        if defaults[name] is None:
+            del defaults[name]
+    namespace = {
+        '__slots__': tuple(fields) + ('_shape',),
+        '__module__': model.__module__,
+        '__doc__': model.__doc__,
+        '__dict__': _Compact.__dict__['__dict__'],  # Else type() adds one
+        '_defaults': defaults,
+        '_interned': frozenset(name for name in fields
+                               if name.endswith('_id'))
+    }
+    return type(model.__name__, (_Compact, model), namespace)
@@ -0,0 +1,200 @@
+#!/usr/bin/python3
+"""
+This module defines a class to manage mysql db storage for hbnb clone under
+an asyncio (ASGI) server. Selected with HBNB_TYPE_STORAGE=asyncdb.
+
+Classes:
+    AsyncDBStorage: asynchronous database storage engine
+
+Dependencies:
+    sqlalchemy.ext.asyncio: asyncio ORM (needs greenlet)
+    aiomysql: asynchronous MySQL driver
+    models: contains all classes used
+    environ: environment variables
+
+"""
+from asyncio import current_task  # Scope of sessions
+from os import environ  # Environment variables
+from sqlalchemy import func, select  # Queries
+from sqlalchemy.ext.asyncio import create_async_engine  # Async ORM engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, async_scoped_session
+from models.base_model import Base
+from models.engine.db_storage import pool_options
+from models.state import State
+from models.city import City
+from models.user import User
+from models.place import Place
+from models.review import Review
+from models.amenity import Amenity
+
+
+class AsyncDBStorage:
+    """This class manages storage of hbnb models in database using the
+    asyncio extension of sqlalchemy, so that a worker serves many requests
+    concurrently instead of blocking a thread per query.
+
+    Methods that talk to the database are coroutines and must be awaited,
+    e.g. `await storage.all(State)`, `await storage.save()`. Sessions are
+    scoped to the asyncio task, i.e. to the request, so new() must be called
+    (and models created) from within a task. Relationships can't be lazy
+    loaded in asyncio, so they are to be loaded eagerly.
+
+    Attributes:
+        __engine: private attribute to manage database engine
+        __session: private attribute to manage database session
+        __schema_ready: private attribute telling whether the tables were
+            created (or found) in the database already
+        __test: private attribute telling whether tables are to be dropped
+            first, in the test environment
+        __classes: private attribute mapping class names to classes
+
+    Methods:
+        __init__: instantiates a new AsyncDBStorage object
+        all: queries current database session based on class name
+        get: returns the object of a class with the given id
+        count: counts the objects of a class
+        new: adds new object to current database session
+        save: commits all changes of current database session
+        delete: deletes obj from current database session if not None
+        reload: creates the session factory of the current database session
+        bootstrap: creates all tables in database, once
+        close: closes the current session, returning its connection to
+            the pool
+    """
+    __engine = None
+    __session = None
+    __schema_ready = False
+    __test = False
+    __classes = {clss.__name__: clss
+                 for clss in (User, State, City, Amenity, Place, Review)}
+
+    def __init__(self):
+        """Instantiates a new AsyncDBStorage object"""
+        # Get environment variables
+        user = environ.get('HBNB_MYSQL_USER')  # User name
+        pwd = environ.get('HBNB_MYSQL_PWD')  # Password
+        host = environ.get('HBNB_MYSQL_HOST', default='localhost')  # Host name
+        db = environ.get('HBNB_MYSQL_DB')  # Database name
+        env = environ.get('HBNB_ENV')  # Environment in use: test or dev
+        pool = pool_options()  # Connection pool settings that are set
+
+        # Create engine
+        self.__engine = create_async_engine(
+                f"mysql+aiomysql://{user}:{pwd}@{host}/{db}",
+                pool_pre_ping=True, **pool)
+
+        # Tables are dropped (if testing) and created by bootstrap()
+        self.__test = env == 'test'
+        self.__schema_ready = False
+
+    async def all(self, cls=None):
+        """Queries current database session based on class name
+
+        Args:
+            cls: class (or class name) to query in database (default=None)
+
+        Returns:
+            returns dictionary of queried classes in database
+        """
+        objects_dict = {}  # Dictionary to store queried objects
+        classes = list(self.__classes.values())
+        if cls:
+            classes = [self.__classes.get(cls, cls)]
+        for clss in classes:  # Query each class in database
+            for obj in await self.__session.scalars(select(clss)):
+                key = f"{obj.__class__.__name__}.{obj.id}"
+                objects_dict[key] = obj  # Key = <class name>.<object id>
+        return objects_dict
+
+    async def get(self, cls, id):
+        """
+        Returns the object of a class with the given id.
+
+        Args:
+            cls: class (or class name) of the object
+            id: id of the object
+
+        Returns:
+            the object, or None if there is no such object
+        """
+        cls = self.__classes.get(cls, cls)
+        if isinstance(cls, str):  # Not a table, e.g. BaseModel
+            return None
+        return await self.__session.get(cls, id)
+
+    async def count(self, cls=None):
+        """
+        Counts the objects of a class with SELECT COUNT(*).
+
+        Args:
+            cls: class (or class name) to count, None to count all objects
+
+        Returns:
+            the number of objects
+        """
+        classes = list(self.__classes.values())
+        if cls:
+            classes = [self.__classes.get(cls, cls)]
+        total = 0
+        for clss in classes:
+            if isinstance(clss, str):  # Not a table, e.g. BaseModel
+                continue
+            statement = select(func.count()).select_from(clss)
+            total += await self.__session.scalar(statement)
+        return total
+
+    def new(self, obj):
+        """
+        Add object to current database session.
+        Not a coroutine: nothing is sent to the database until save().
+
+        Args:
+            obj: object to add to current database session
+        """
+        self.__session.add(obj)  # Add object to current database session
+
+    async def save(self):
+        """
+        Commits all changes of current database session.
+        """
+        await self.__session.commit()  # Commit changes to database
+
+    async def delete(self, obj=None):
+        """
+        Deletes obj from current database session.
+        If obj is None, nothing happens.
+
+        Args:
+            obj: object to delete from current database session (default=None)
+        """
+        if obj is not None:  # Case where obj has a value
+            await self.__session.delete(obj)
+
+    def reload(self):
+        """
+        Creates the factory of the current database session.
+        Not a coroutine, as it is called when models is imported; the
+        tables are created by bootstrap(), to be awaited at startup.
+        """
+        factory = async_sessionmaker(self.__engine, expire_on_commit=False)
+        self.__session = async_scoped_session(factory, scopefunc=current_task)
+
+    async def bootstrap(self):
+        """
+        Create all tables in database that don't exist yet, once per storage
+        (dropping them first in the test environment).
+        """
+        if self.__schema_ready:
+            return
+        async with self.__engine.begin() as connection:
+            if self.__test:
+                await connection.run_sync(Base.metadata.drop_all)
+            await connection.run_sync(Base.metadata.create_all)
+        self.__schema_ready = True
+
+    async def close(self):
+        """
+        Close the current session, e.g. at the end of a request.
+        Its connection goes back to the pool.
+        """
+        await self.__session.remove()  # Close current session
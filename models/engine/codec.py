@@ -0,0 +1,143 @@
+#!/usr/bin/python3
+"""
+This module defines the JSON codecs file storage can serialize with.
+
+Classes:
+    Codec: a named pair of dumps/loads functions
+
+Functions:
+    available: names of the codecs that can be used here
+    get_codec: returns a codec by name, or the fastest one available
+
+Dependencies:
+    orjson, ujson: optional fast JSON libraries
+    json: standard library fallback
+"""
+import json
+import re
+from datetime import datetime
+
+
+class Codec:
+    """
+    Pairs a codec name with its dumps and loads functions.
+
+    Attributes:
+        name: name of the codec
+        dumps: serializes an object to UTF-8 JSON bytes, writing datetime
+            objects in ISO format
+        loads: parses JSON from bytes or str
+    """
+
+    def __init__(self, name, dumps, loads):
+        """Instantiates a new Codec"""
+        self.name = name
+        self.dumps = dumps
+        self.loads = loads
+
+    def __repr__(self):
+        """Returns the representation of the codec"""
+        return f"<Codec {self.name}>"
+
+
+_digits = bytes.maketrans(b'123456789', b'0' * 9)  # Every digit to 0
+
+
+def _long_number(data):
+    """
+    Tells whether JSON bytes or str hold a run of 19 digits or more, as
+    integers of over 64 bits do. Bytes are searched after mapping every
+    digit to 0, which is several times faster than a regular expression.
+    """
+    if isinstance(data, str):
+        return re.search('[0-9]{19}', data) is not None
+    return bytes(data).translate(_digits).find(b'0' * 19) != -1
+
+
+def _isoformat(obj):
+    """Serializes the datetime objects the JSON libraries can't handle"""
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} "
+                    "is not JSON serializable")
+
+
+def _orjson():
+    """
+    Returns the orjson codec, which handles datetime objects natively.
+    orjson only handles integers of up to 64 bits: it can't write larger
+    ones, and reads them as floats, so data holding any is left to the
+    standard library.
+    """
+    import orjson
+
+    def dumps(obj):
+        """Serializes obj to JSON bytes"""
+        try:
+            return orjson.dumps(obj)
+        except orjson.JSONEncodeError:  # e.g. an integer over 64 bits
+            return json.dumps(obj, default=_isoformat,
+                              ensure_ascii=False).encode()
+
+    def loads(data):
+        """Parses JSON from bytes or str"""
+        if _long_number(data):  # May hold an integer over 64 bits
+            return json.loads(data)
+        return orjson.loads(data)
+    return Codec('orjson', dumps, loads)
+
+
+def _ujson():
+    """Returns the ujson codec"""
+    import ujson
+
+    def dumps(obj):
+        """Serializes obj to JSON bytes"""
+        return ujson.dumps(obj, ensure_ascii=False, default=_isoformat,
+                           escape_forward_slashes=False).encode()
+    return Codec('ujson', dumps, ujson.loads)
+
+
+def _json():
+    """Returns the standard library codec"""
+    def dumps(obj):
+        """Serializes obj to JSON bytes"""
+        return json.dumps(obj, default=_isoformat).encode()
+    return Codec('json', dumps, json.loads)
+
+
+_codecs = {'orjson': _orjson, 'ujson': _ujson, 'json': _json}  # Fastest 1st
+
+
+def available():
+    """
+    Returns the names of the codecs whose library is installed, fastest
+    first.
+    """
+    names = []
+    for name, codec in _codecs.items():
+        try:
+            codec()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+
+def get_codec(name=None):
+    """
+    Returns a codec.
+
+    Args:
+        name (str): orjson, ujson or json. If None or empty, the fastest
+            codec available is returned.
+
+    Raises:
+        ValueError: If name is not a known codec
+        ImportError: If the library of the named codec is not installed
+    """
+    if name:
+        if name not in _codecs:
+            raise ValueError(f"Unknown JSON codec: {name}")
+        return _codecs[name]()
+    return _codecs[available()[0]]()
@@ -0,0 +1,249 @@
+#!/usr/bin/python3
+"""
+This module defines the columnar tables file storage builds for analytic
+reads, e.g. storage.columns(Place).mean('price_by_night').
+
+A table holds the objects of a class as one column per field instead of one
+object per row: numbers in typed arrays, other values dictionary encoded
+(a table of the distinct values, and an array of codes into it), so that
+ids and foreign keys shared by many rows are stored once. Filters return
+row positions, which aggregates take to only look at those rows.
+
+Classes:
+    Table: columns of the objects of a class
+    Row: view of a row of a table
+
+Dependencies:
+    array: typed arrays of numbers
+"""
+from array import array
+from collections import Counter
+from itertools import compress, repeat
+from operator import eq
+
+_typecodes = {bool: 'b', int: 'q', float: 'd'}
+
+
+def _hashable(value):
+    """Returns value, or a hashable copy of it if it is a list, set or
+    dictionary"""
+    if isinstance(value, list):
+        return tuple(map(_hashable, value))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(map(_hashable, value))
+    if isinstance(value, dict):
+        return tuple((key, _hashable(item)) for key, item in value.items())
+    return value
+
+
+class _Encoded:
+    """
+    Dictionary encoded column.
+
+    Attributes:
+        values (list): distinct values, by code
+        codes (array): code of the value of each row
+    """
+
+    def __init__(self, values):
+        """
+        Encodes the values of a column, giving each distinct value one
+        code. Values of different types (e.g. 1 and True) are distinct.
+        """
+        self.values = []
+        self.codes = array('I')
+        codes = {}  # Codes of the hashable values: {(<type>, <value>):}
+        unhashable = []  # Codes of the others, e.g. lists of amenity ids
+        for value in values:
+            try:
+                code = codes.get((type(value), value))
+            except TypeError:  # Searched for among the unhashable values
+                code = next((code for code in unhashable
+                             if type(self.values[code]) is type(value) and
+                             self.values[code] == value), None)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    unhashable.append(code)
+            else:
+                if code is None:
+                    code = codes[(type(value), value)] = len(self.values)
+                    self.values.append(value)
+            self.codes.append(code)
+
+    def __len__(self):
+        """Returns the number of rows"""
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        """Returns the value of a row"""
+        return self.values[self.codes[row]]
+
+    def __iter__(self):
+        """Iterates over the values of the rows"""
+        return map(self.values.__getitem__, self.codes)
+
+
+class Table:
+    """
+    Columns of the objects of a class.
+
+    Attributes:
+        name (str): name of the class
+        keys (list): key (<class name>.<id>) of each row
+    """
+
+    def __init__(self, name, fields, records):
+        """
+        Builds the columns of a table.
+
+        Args:
+            name (str): name of the class
+            fields (tuple): names of the columns
+            records (dict): {<key>: <tuple of the values of the fields>}
+        """
+        self.name = name
+        self.keys = list(records)
+        self.__columns = {}
+        rows = list(records.values())
+        for position, field in enumerate(fields):
+            values = [row[position] for row in rows]
+            self.__columns[field] = self.__column(values)
+
+    @staticmethod
+    def __column(values):
+        """Stores values in a typed array if they are all numbers of the
+        same type, dictionary encoded otherwise"""
+        kinds = set(map(type, values))
+        if len(kinds) == 1:
+            typecode = _typecodes.get(kinds.pop())
+            if typecode is not None:
+                try:
+                    return array(typecode, values)
+                except OverflowError:
+                    pass
+        elif kinds and kinds <= {int, float}:
+            return array('d', values)
+        return _Encoded(values)
+
+    def __len__(self):
+        """Returns the number of rows"""
+        return len(self.keys)
+
+    def __getitem__(self, field):
+        """Returns the column of a field, indexable by row position"""
+        return self.__columns[field]
+
+    def fields(self):
+        """Returns the names of the columns"""
+        return list(self.__columns)
+
+    def where(self, field, value):
+        """
+        Returns the positions of the rows whose field equals value.
+        On encoded columns, value is compared to the distinct values, then
+        the codes of the rows to the codes of the equal ones.
+        """
+        column = self.__columns[field]
+        if isinstance(column, _Encoded):
+            equal = {code for code, distinct in enumerate(column.values)
+                     if distinct == value}
+            matches = map(equal.__contains__, column.codes)
+        else:
+            matches = map(eq, column, repeat(value))
+        return list(compress(range(len(column)), matches))
+
+    def between(self, field, low=None, high=None, rows=None):
+        """
+        Returns the positions of the rows whose field is within
+        [low, high], among rows (positions) if given, all rows otherwise.
+        """
+        column = self.__columns[field]
+        if rows is None:
+            rows = range(len(column))
+        return [row for row in rows
+                if (low is None or column[row] >= low) and
+                (high is None or column[row] <= high)]
+
+    def values(self, field, rows=None):
+        """Returns the values of a field, for the given row positions"""
+        column = self.__columns[field]
+        if rows is None:
+            return column
+        return [column[row] for row in rows]
+
+    def sum(self, field, rows=None):
+        """Returns the sum of a numeric field"""
+        return sum(self.values(field, rows))
+
+    def mean(self, field, rows=None):
+        """Returns the mean of a numeric field, None if there are no rows"""
+        values = self.values(field, rows)
+        if not len(values):
+            return None
+        return sum(values) / len(values)
+
+    def min(self, field, rows=None):
+        """Returns the smallest value of a field, None if there are no rows"""
+        return min(self.values(field, rows), default=None)
+
+    def max(self, field, rows=None):
+        """Returns the largest value of a field, None if there are no rows"""
+        return max(self.values(field, rows), default=None)
+
+    def count_by(self, field, rows=None):
+        """
+        Returns the number of rows per value of a field, e.g. per city.
+        Values that can't be dictionary keys are counted under a hashable
+        copy: lists as tuples, sets as frozensets, dictionaries as tuples
+        of their items.
+        """
+        column = self.__columns[field]
+        if not isinstance(column, _Encoded):
+            return dict(Counter(self.values(field, rows)))
+        codes = column.codes
+        if rows is not None:
+            codes = [codes[row] for row in rows]
+        counts = Counter()
+        for code, count in Counter(codes).items():
+            counts[_hashable(column.values[code])] += count
+        return dict(counts)
+
+    def rows(self, rows=None):
+        """Returns views of the rows at the given positions (all rows if
+        None), which read their values from the columns"""
+        if rows is None:
+            rows = range(len(self))
+        return [Row(self, row) for row in rows]
+
+
+class Row:
+    """
+    View of a row of a table: its fields read as attributes from the
+    columns, and model() returns the object from storage.
+    """
+    __slots__ = ('_table', '_row')
+
+    def __init__(self, table, row):
+        """Views the row at position row of table"""
+        self._table = table
+        self._row = row
+
+    def __getattr__(self, field):
+        """Returns the value of a field of the row"""
+        try:
+            return self._table[field][self._row]
+        except KeyError:
+            raise AttributeError(f"'{self._table.name}' row has no "
+                                 f"field '{field}'") from None
+
+    def __repr__(self):
+        """Returns the representation of the row"""
+        return f"<{self._table.name} row {self._table.keys[self._row]}>"
+
+    def model(self):
+        """Returns the object of the row from storage"""
+        from models import storage
+
+        name, _, id = self._table.keys[self._row].partition('.')
+        return storage.get(name, id)
@@ -5,35 +5,95 @@ This module defines a class to manage mysql db storage for hbnb clone.
 Classes:
     DBStorage: database storage engine
 
+Functions:
+    pool_options: connection pool settings set in the environment
+
 Dependencies:
     sqlalchemy: ORM
     models: contains all classes used
     environ: environment variables
+    concurrent.futures: runs the per-table queries of all() in parallel
 
 """
+from concurrent.futures import ThreadPoolExecutor  # Parallel table queries
+from threading import Lock  # One parallel all() at a time
 from os import environ  # Environment variables
-from sqlalchemy import create_engine  # ORM engine instantiator
+from sqlalchemy import create_engine, event, inspect  # ORM engine, events
+from sqlalchemy import func, insert, select, update  # Statements
 from sqlalchemy.orm import sessionmaker, scoped_session  # ORM session manager
+from sqlalchemy.orm import make_transient_to_detached  # Bulk saved objects
+from sqlalchemy.orm.attributes import set_committed_value  # Bulk updates
+from sqlalchemy.orm import joinedload, selectinload  # Eager loading
+from models.base_model import Base
+from models.engine.projection import record_type
+from models.state import State
+from models.city import City
+from models.user import User
+from models.place import Place
+from models.review import Review
+from models.amenity import Amenity
+
+
+def pool_options():
+    """
+    Returns the connection pool settings set in the environment, as
+    create_engine keyword arguments.
+    """
+    pool = {}
+    for option, parse in (('pool_size', int), ('max_overflow', int),
+                          ('pool_recycle', int), ('pool_timeout', float)):
+        value = environ.get('HBNB_MYSQL_' + option.upper())
+        if value:
+            pool[option] = parse(value)  # The timeout may be fractional
+    return pool
 
 
 class DBStorage:
     """This class manages storage of hbnb models in database using sqlalchemy
 
+    The connection pool is configured with HBNB_MYSQL_POOL_SIZE,
+    HBNB_MYSQL_MAX_OVERFLOW, HBNB_MYSQL_POOL_RECYCLE and
+    HBNB_MYSQL_POOL_TIMEOUT (seconds), SQLAlchemy's defaults otherwise.
+
     Attributes:
         __engine: private attribute to manage database engine
         __session: private attribute to manage database session
+        __factory: private attribute to open sessions of all()'s workers
+        __schema_ready: private attribute telling whether the tables were
+            created (or found) in the database already
+        __batch: number of rows fetched at a time by all()'s workers, and
+            written at a time by bulk_save()
+        __workers: number of pooled connections all()'s workers may use,
+            one less than the pool size
+        __fetching: private lock held by the all() whose workers run
+        __bulk: private attribute holding the objects queued by bulk_new()
+        __classes: private attribute mapping class names to classes
 
     Methods:
         __init__: instantiates a new DBStorage object
         all: queries current database session based on class name
+        query: queries objects of a class filtered, sorted and paginated
+        get: returns the object of a class with the given id
+        count: counts the objects of a class
         new: adds new object to current database session
         save: commits all changes of current database session
+        bulk_new: queues objects for bulk_save()
+        bulk_save: writes the queued objects in batches and commits
         delete: deletes obj from current database session if not None
         reload: creates all tables in database and current database session
-        close: closes the current session
+        bootstrap: creates all tables in database, once
+        close: closes the current session, returning its connection to
+            the pool
     """
     __engine = None
     __session = None
+    __factory = None
+    __schema_ready = False
+    __batch = 1000
+    __workers = 4
+    __fetching = None
+    __classes = {clss.__name__: clss
+                 for clss in (User, State, City, Amenity, Place, Review)}
 
     def __init__(self):
         """Instantiates a new DBStorage object"""
@@ -43,29 +103,49 @@ class DBStorage:
         host = environ.get('HBNB_MYSQL_HOST', default='localhost')  # Host name
         db = environ.get('HBNB_MYSQL_DB')  # Database type: file or db
         env = environ.get('HBNB_ENV')  # Environment in use: test or dev
+        pool = pool_options()  # Connection pool settings that are set
 
         # Create engine
         self.__engine = create_engine(
                 f"mysql+mysqldb://{user}:{pwd}@{host}/{db}",
-                pool_pre_ping=True)
+                pool_pre_ping=True, **pool)
 
         # Drop tables if testing
         if env == 'test':
             Base.metadata.drop_all(self.__engine)
+        self.__schema_ready = False
+        self.__bulk = []
+
+        # all()'s workers leave a pooled connection to the request's session
+        pool_size = pool.get('pool_size', 5)  # SQLAlchemy's default
+        self.__workers = min(len(self.__classes), pool_size - 1)
+        self.__fetching = Lock()
 
-    def all(self, cls=None):
+    def all(self, cls=None, fields=None):
         """Queries current database session based on class name
 
         Args:
-            cls: class name to query in database (default=None)
+            cls: class (or class name) to query in database (default=None)
+            fields: names of the columns to select, in which case records
+                of those columns are returned instead of objects
 
         Returns:
             returns dictionary of queried classes in database
         """
         objects_dict = {}  # Dictionary to store queried objects
-        classes = [User, State, City, Amenity, Place, Review]
+        classes = list(self.__classes.values())
         if cls:
-            classes = [cls]
+            classes = [self.__classes.get(cls, cls)]
+        if fields is not None:
+            return self.__project(classes, tuple(fields))
+        # Parallel when others see the same rows, and no other all()'s
+        # workers hold pooled connections
+        if not cls and self.__workers > 1 and not self.__unsaved() and \
+                self.__fetching.acquire(blocking=False):
+            try:
+                return self.__all_concurrently(classes)
+            finally:
+                self.__fetching.release()
         # Query all classes in database
         for clss in classes:  # Query each class in database
             objects = self.__session.query(clss).all()
@@ -74,6 +154,190 @@ class DBStorage:
                 objects_dict[key] = obj  # Key = <class name>.<object id>
         return objects_dict
 
+    def query(self, cls, where=None, order_by=None, limit=None, offset=0,
+              load=None):
+        """
+        Queries objects of a class, filtered, sorted and paginated by the
+        database with WHERE, ORDER BY, LIMIT and OFFSET. Relationships named
+        in load are loaded along with the objects, in a constant number of
+        statements, instead of one lazy load per object.
+
+        Args:
+            cls: class (or class name) to query
+            where: dictionary of {column name: value} to match
+            order_by: column name(s) to sort by, each prefixed with '-' for
+                descending order
+            limit: maximum number of objects to return
+            offset: number of objects to skip
+            load: relationship(s) to load eagerly, e.g. ['cities'], or
+                dotted paths such as 'cities.places'
+
+        Returns:
+            list of queried objects
+        """
+        cls = self.__classes.get(cls, cls)
+        statement = select(cls).filter_by(**(where or {}))
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        for name in order_by or []:
+            column = getattr(cls, name.lstrip('-'))
+            if name.startswith('-'):
+                column = column.desc()
+            statement = statement.order_by(column)
+        statement = statement.limit(limit).offset(offset)
+        if isinstance(load, str):
+            load = [load]
+        for path in load or []:
+            statement = statement.options(self.__loader(cls, path))
+        return list(self.__session.scalars(statement))
+
+    def get(self, cls, id):
+        """
+        Returns the object of a class with the given id, looked up by
+        primary key (from the session's identity map when it is there).
+
+        Args:
+            cls: class (or class name) of the object
+            id: id of the object
+
+        Returns:
+            the object, or None if there is no such object
+        """
+        cls = self.__classes.get(cls, cls)
+        if isinstance(cls, str):  # Not a table, e.g. BaseModel
+            return None
+        return self.__session.get(cls, id)
+
+    def count(self, cls=None):
+        """
+        Counts the objects of a class with SELECT COUNT(*).
+
+        Args:
+            cls: class (or class name) to count, None to count all objects
+
+        Returns:
+            the number of objects
+        """
+        classes = list(self.__classes.values())
+        if cls:
+            classes = [self.__classes.get(cls, cls)]
+        total = 0
+        for clss in classes:
+            if isinstance(clss, str):  # Not a table, e.g. BaseModel
+                continue
+            statement = select(func.count()).select_from(clss)
+            total += self.__session.scalar(statement)
+        return total
+
+    @staticmethod
+    def __loader(cls, path):
+        """
+        Builds the eager loading option of a relationship path.
+        Collections are loaded with one SELECT ... IN per relationship
+        (selectinload), many-to-one relationships with a JOIN (joinedload).
+
+        Args:
+            cls: class the path starts from
+            path: dotted relationship names, e.g. 'cities.places'
+
+        Returns:
+            the loader option
+        """
+        option = None
+        for name in path.split('.'):
+            relationship = inspect(cls).relationships[name]
+            strategy = selectinload if relationship.uselist else joinedload
+            attribute = relationship.class_attribute
+            if option is None:
+                option = strategy(attribute)
+            else:
+                option = getattr(option, strategy.__name__)(attribute)
+            cls = relationship.mapper.class_
+        return option
+
+    def __project(self, classes, fields):
+        """
+        Selects only the given columns (and the id, for the keys) of each
+        class, without building ORM objects.
+
+        Args:
+            classes: classes to query
+            fields: names of the columns to select
+
+        Returns:
+            dictionary of records: {<class name>.<id>: <record>}
+        """
+        records = {}
+        for cls in classes:
+            record = record_type(cls.__name__, fields)
+            columns = [getattr(cls, field) for field in fields]
+            for row in self.__session.execute(select(cls.id, *columns)):
+                records[f"{cls.__name__}.{row[0]}"] = record._make(row[1:])
+        return records
+
+    def __all_concurrently(self, classes):
+        """
+        Queries the classes in parallel, on up to __workers pooled
+        connections, streaming rows in batches, then attaches the objects
+        to the current session. Objects the session already holds are
+        returned as they are. Each table is read in a transaction of its
+        own, so the tables are not read at the same point in time: a
+        change committed meanwhile may show in some tables only.
+
+        Args:
+            classes: classes to query
+
+        Returns:
+            dictionary of queried objects
+        """
+        with ThreadPoolExecutor(max_workers=self.__workers) as executor:
+            results = list(executor.map(self.__fetch, classes))
+        session = self.__session()
+        identity_map = session.identity_map
+        objects_dict = {}
+        for objects in results:
+            for obj in objects:
+                current = identity_map.get(session.identity_key(instance=obj))
+                if current is None:
+                    session.add(obj)  # Attaches the detached object
+                    current = obj
+                objects_dict[f"{current.__class__.__name__}.{obj.id}"] = \
+                    current
+        return objects_dict
+
+    def __fetch(self, cls):
+        """
+        Queries all rows of cls in a session of its own.
+
+        Args:
+            cls: class to query
+
+        Returns:
+            list of the objects, detached from the closed session
+        """
+        with self.__factory() as session:
+            statement = select(cls).execution_options(yield_per=self.__batch)
+            return list(session.scalars(statement))
+
+    def __unsaved(self):
+        """
+        Tells whether the current session holds changes not committed yet,
+        which the connections of other sessions can't see.
+        """
+        session = self.__session()
+        return bool(session.new or session.dirty or session.deleted or
+                    session.info.get('flushed'))
+
+    @staticmethod
+    def __flushed(session, flush_context):
+        """Records that session wrote changes it did not commit yet"""
+        session.info['flushed'] = True
+
+    @staticmethod
+    def __ended(session):
+        """Records that session has no uncommitted changes anymore"""
+        session.info.pop('flushed', None)
+
     def new(self, obj):
         """
         Add object to current database session.
@@ -89,6 +353,54 @@ class DBStorage:
         """
         self.__session.commit()  # Commit changes to database
 
+    def bulk_new(self, objs):
+        """
+        Queues objects for the next bulk_save(), instead of adding them to
+        the current database session one by one.
+
+        Args:
+            objs: iterable of objects to save
+        """
+        session = self.__session()
+        for obj in objs:
+            if obj in session.new:  # e.g. added by BaseModel()
+                session.expunge(obj)
+            self.__bulk.append(obj)
+
+    def bulk_save(self):
+        """
+        Writes the objects queued by bulk_new() with executemany INSERTs
+        (UPDATEs for objects already in the database) of up to __batch rows
+        per class, and commits once. Inserted objects are then attached to
+        the current database session as if they had been loaded from it.
+        """
+        session = self.__session()
+        queued, self.__bulk = self.__bulk, []
+        groups = {}  # Objects by (class, whether in database already)
+        for obj in queued:
+            stored = inspect(obj).has_identity
+            groups.setdefault((type(obj), stored), []).append(obj)
+        with session.no_autoflush:  # Else changes are written twice
+            for (cls, stored), objs in groups.items():
+                columns = [column.key for column in inspect(cls).column_attrs]
+                statement = update(cls) if stored else insert(cls)
+                for start in range(0, len(objs), self.__batch):
+                    rows = [{key: obj.__dict__[key] for key in columns
+                             if key in obj.__dict__}
+                            for obj in objs[start:start + self.__batch]]
+                    session.execute(statement, rows)
+                if stored:  # Written: the commit must not flush them again
+                    for obj in objs:
+                        changed = inspect(obj).committed_state
+                        for key in set(changed).intersection(columns):
+                            set_committed_value(obj, key, obj.__dict__[key])
+        session.commit()
+        for (cls, stored), objs in groups.items():
+            if not stored:
+                for obj in objs:
+                    make_transient_to_detached(obj)
+                session.add_all(objs)
+
     def delete(self, obj=None):
         """
         Deletes obj from current database session.
@@ -103,24 +415,34 @@ class DBStorage:
     def reload(self):
         """
         Create all tables in database and current database session.
+        The tables are only created by the first call; later ones only
+        start a new session.
+        """
+        self.bootstrap()  # Create all tables in db
+        if self.__factory is None:  # Create session factory
+            factory = sessionmaker(bind=self.__engine, expire_on_commit=False)
+            event.listen(factory, 'after_flush', self.__flushed)
+            event.listen(factory, 'after_commit', self.__ended)
+            event.listen(factory, 'after_rollback', self.__ended)
+            self.__factory = factory
+            self.__session = scoped_session(factory)
+        else:
+            self.__session.remove()  # Start a new current session
+
+    def bootstrap(self):
+        """
+        Create all tables in database that don't exist yet.
+        Checking which tables exist takes round-trips to the information
+        schema, so it is only done once per storage.
         """
-        from models.base_model import Base
-        from models.state import State
-        from models.city import City
-        from models.user import User
-        from models.place import Place
-        from models.review import Review
-        from models.amenity import Amenity
-        Base.metadata.create_all(self.__engine)  # Create all tables in db
-        # Create session factory
-        Session = scoped_session(sessionmaker(
-            bind=self.__engine,
-            expire_on_commit=False))
-        self.__session = Session  # Create current session
+        if not self.__schema_ready:
+            Base.metadata.create_all(self.__engine)
+            self.__schema_ready = True
 
     def close(self):
         """
-        Close the current session.
+        Close the current session, e.g. at the end of a web request.
+        Its connection goes back to the pool, and the next access to the
+        session opens a new one.
         """
         self.__session.remove()  # Close current session
-        self.reload()  # Create new session
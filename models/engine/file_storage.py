@@ -1,68 +1,555 @@
 #!/usr/bin/python3
 """This module defines a class to manage file storage for hbnb clone"""
+import gc
+import heapq
 import json
+import os
+from datetime import datetime
+from operator import attrgetter
+from types import MappingProxyType
+from json.decoder import WHITESPACE
+from models.engine.codec import get_codec
+from models.engine.projection import record_type
+
+_mutable_types = frozenset((list, dict, set))  # Types that change in place
+
+
+def _iter_members(f, size=2 ** 20):
+    """
+    Parses the JSON object in file f incrementally.
+
+    Args:
+        f (file): Text file holding a JSON object
+        size (int): Number of characters to read at a time
+
+    Yields:
+        The (key, value, start, end) of each member of the object, in file
+        order, where start and end locate the value's text in the file
+
+    Raises:
+        json.JSONDecodeError: If the file does not hold a JSON object
+    """
+    decoder = json.JSONDecoder()
+    buf = f.read(size)
+    pos = 0
+    offset = 0  # Position of buf in the file
+
+    def refill(pos):
+        """Drops the text before pos and reads more, False on end of file"""
+        nonlocal buf, offset
+        text = f.read(max(size, len(buf) - pos))
+        if not text:
+            return False
+        buf = buf[pos:] + text
+        offset += pos
+        return True
+
+    def token(pos):
+        """Returns the position of the next non-space character"""
+        while True:
+            pos = WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or not refill(pos):
+                return pos
+            pos = 0
+
+    def value(pos):
+        """Decodes the JSON value at pos, reading more text if needed"""
+        while True:
+            try:
+                return (pos,) + decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if not refill(pos):
+                    raise
+                pos = 0
+
+    pos = token(pos)
+    if buf[pos:pos + 1] != '{':
+        raise json.JSONDecodeError("Expecting '{'", buf, pos)
+    pos = token(pos + 1)
+    if buf[pos:pos + 1] == '}':
+        return
+    while True:
+        start, key, pos = value(pos)
+        if not isinstance(key, str):
+            raise json.JSONDecodeError("Expecting property name", buf, pos)
+        pos = token(pos)
+        if buf[pos:pos + 1] != ':':
+            raise json.JSONDecodeError("Expecting ':' delimiter", buf, pos)
+        start, val, pos = value(token(pos + 1))
+        yield key, val, offset + start, offset + pos
+        pos = token(pos)
+        if buf[pos:pos + 1] == '}':
+            return
+        if buf[pos:pos + 1] != ',':
+            raise json.JSONDecodeError("Expecting ',' delimiter", buf, pos)
+        pos = token(pos + 1)
 
 
 class FileStorage:
-    """This class manages storage of hbnb models in JSON format"""
+    """
+    This class manages storage of hbnb models in JSON format.
+
+    By default save() rewrites the whole file. With HBNB_FILE_JOURNAL set,
+    save() appends the objects changed since the last save as JSON lines to
+    <file>.log, and the log is folded back into the file once it grows past
+    HBNB_FILE_JOURNAL_LIMIT bytes.
+
+    Either way, objects are only re-serialized when they are dirty: the JSON
+    text of every clean object is cached and spliced into the next write.
+    Objects holding lists, dictionaries or sets (e.g. Place.amenity_ids),
+    which can change in place without storage knowing, are re-serialized on
+    every save, and written if their JSON changed.
+
+    With HBNB_FILE_LAZY set, reload() only records where each object lies in
+    the file, and builds the models of a class the first time all(),
+    all(cls), related(), query() or get() asks for them.
+
+    JSON is encoded with the fastest codec installed (see codec.py), unless
+    HBNB_FILE_CODEC names one. Files up to HBNB_FILE_STREAM_SIZE bytes are
+    decoded in one go by the codec, larger ones are streamed.
+
+    With HBNB_FILE_FORMAT=msgpack, snapshots are written in the binary
+    format of snapshot.py to <file without .json>.msgpack instead, and
+    reloads are always eager. The journal stays in JSON lines. Binary
+    snapshots are about 40% smaller than JSON, and decode several times
+    faster, but building the models takes most of a reload, so reloads
+    are only 1.5-2 times faster.
+
+    With HBNB_FILE_MMAP set, storage is read-only: reload() maps a binary
+    snapshot (e.g. made by snapshot.py) into memory and only reads its
+    header, and each object is decoded from the mapping when first asked
+    for, as in lazy mode. Worker processes mapping the same snapshot share
+    its pages. new(), save() and delete() raise PermissionError.
+
+    With HBNB_FILE_COMPACT set, loaded objects are built with the slotted
+    classes of compact.py, which take less memory than the models.
+
+    close(), called at the end of every web request, only parses the file
+    again when it was replaced or modified since it was loaded (as told by
+    its inode, size and mtime); otherwise it only replays the records
+    appended to the journal since the last replay.
+    """
     __file_path = 'file.json'
     __objects = {}
+    __codec = get_codec(os.getenv('HBNB_FILE_CODEC'))
+    __stream_size = int(os.getenv('HBNB_FILE_STREAM_SIZE', 64 * 2 ** 20))
+    __format = os.getenv('HBNB_FILE_FORMAT', 'json')
+    __journal = bool(os.getenv('HBNB_FILE_JOURNAL'))
+    __journal_limit = int(os.getenv('HBNB_FILE_JOURNAL_LIMIT', 64 * 2 ** 20))
+    __dirty = set()  # Keys put or changed since the last save
+    __fragments = {}  # Serialized clean objects: {<key>: (<obj>, <json>)}
+    __mutable = set()  # Keys of objects holding lists, dicts or sets
+    __lazy = bool(os.getenv('HBNB_FILE_LAZY'))
+    __mmap = bool(os.getenv('HBNB_FILE_MMAP'))
+    __compact = bool(os.getenv('HBNB_FILE_COMPACT'))
+    __mapped = None  # (<mmap>, {<class name>: <fields>}) in mmap mode
+    __stamp = None  # (<inode>, <size>, <mtime>) of the file last loaded
+    __log_position = (None, 0)  # (<inode>, <offset>) of the journal replayed
+    __pending = {}  # Unbuilt objects: {<class name>: {<key>: (start, end)}}
+    __source = None  # The file (kept open) lazy spans locate records in
+    __removed = set()  # Keys deleted since the last save
+    __rewrite = False  # Whether the next save must rewrite the whole file
+    __classes = {}  # Class index: {<class name>: {<key>: <obj>}}
+    __related = {}  # Reverse index: {(<class name>, <attr>): {<value>: ...}}
+    __indexed = None  # The __objects dictionary the indexes were built from
+    __version = 0  # Bumped on every change, to tell when tables are stale
+    __tables = {}  # {(<class>, <fields>): (<objects>, <version>, <table>)}
+    __references = {  # Foreign keys kept in the reverse index, per class
+        'City': ('state_id',),
+        'Place': ('city_id', 'user_id'),
+        'Review': ('place_id', 'user_id')
+    }
 
-    def all(self, cls=None):
+    def all(self, cls=None, fields=None):
         """
         Returns a dictionary of models currently in storage.
-        If cls is not None, returns a dictionary of models of type cls
+        If cls is not None, returns a read-only view of the models of type
+        cls, served from the per-class index instead of a full scan.
+        If fields is not None, returns records of those attributes instead
+        of models, which are not built for objects that are not loaded.
 
         Args:
-            cls (str): The name of the class type to return
+            cls (class or str): The class (or class name) to return
+            fields (list): Names of the attributes to project
 
         Returns:
-            A dictionary of models in storage
+            A dictionary of models (or records) in storage
         """
-        if cls:
+        if fields is not None:
+            return self.__project(cls, tuple(fields))
+        if cls is None:
+            self.__load(list(self.__pending))
+            return self.__objects
+        if isinstance(cls, str):
+            self.__load([cls])
+            return MappingProxyType(self.__index().setdefault(cls, {}))
+        models = self.__models()
+        self.__load([name for name in self.__pending
+                     if issubclass(models.get(name, object), cls)])
+        classes = self.__index()
+        matches = [objs for objs in classes.values()
+                   if objs and isinstance(next(iter(objs.values())), cls)]
+        if len(matches) > 1:  # cls is a parent class, e.g. BaseModel
             instances = {}
-            for key, obj in self.__objects.items():
-                if isinstance(obj, cls):
-                    instances[key] = obj
-            return instances
-        return self.__objects
+            for objs in matches:
+                instances.update(objs)
+            return MappingProxyType(instances)
+        if matches:
+            return MappingProxyType(matches[0])
+        return MappingProxyType(classes.setdefault(cls.__name__, {}))
+
+    def related(self, cls, attr, value):
+        """
+        Returns a read-only view of the models of type cls whose foreign key
+        attr equals value, e.g. related(City, 'state_id', state.id).
+
+        Args:
+            cls (class or str): The class (or class name) to look up
+            attr (str): A foreign key listed in __references for cls
+            value (str): The id the foreign key must match
+
+        Returns:
+            A dictionary of matching models in storage
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        self.__load([name])
+        self.__index()
+        objs = self.__related.get((name, attr), {}).get(value, {})
+        return MappingProxyType(objs)
+
+    def query(self, cls, where=None, order_by=None, limit=None, offset=0,
+              load=None):
+        """
+        Returns the models of type cls matching where, sorted and paginated.
+        A foreign key in where is looked up in the reverse index, and only
+        the first offset + limit models are sorted when there is a limit.
+
+        Args:
+            cls (class or str): The class (or class name) to query
+            where (dict): {<attribute>: <value>} the models must match
+            order_by (str or list): Attribute(s) to sort by, each prefixed
+                with '-' for descending order
+            limit (int): Maximum number of models to return
+            offset (int): Number of models to skip
+            load (list): Relationships to load eagerly in db storage. They
+                are served from the indexes here, so it is ignored
+
+        Returns:
+            A list of models
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        where = dict(where or {})
+        for attr in self.__references.get(name, ()):
+            if attr in where:
+                objs = self.related(cls, attr, where.pop(attr)).values()
+                break
+        else:
+            objs = self.all(cls).values()
+        if where:
+            objs = [obj for obj in objs
+                    if all(getattr(obj, attr, None) == value
+                           for attr, value in where.items())]
+        if isinstance(order_by, str):
+            order_by = [order_by]
+        order_by = order_by or []
+        stop = None if limit is None else offset + limit
+        if stop is not None and len(order_by) == 1:
+            attr = order_by[0]
+            select = heapq.nlargest if attr.startswith('-') else \
+                heapq.nsmallest
+            objs = select(stop, objs, key=attrgetter(attr.lstrip('-')))
+        else:
+            objs = list(objs)
+            for attr in reversed(order_by):  # Stable sorts, last key first
+                objs.sort(key=attrgetter(attr.lstrip('-')),
+                          reverse=attr.startswith('-'))
+        return objs[offset:stop]
+
+    def columns(self, cls, fields=None):
+        """
+        Returns a columnar table (see columns.py) of the models of type cls,
+        to filter and aggregate many models at once, e.g.
+        columns(Place).mean('price_by_night'). It is built from a projection,
+        so models that are not loaded are not built, and is cached until
+        storage changes.
+
+        Args:
+            cls (class or str): The class (or class name) to tabulate
+            fields (list): Names of the columns, by default the fields the
+                class declares, plus id, created_at and updated_at
+
+        Returns:
+            A Table
+        """
+        from models.compact import declared
+        from models.engine.columns import Table
+
+        name = cls if isinstance(cls, str) else cls.__name__
+        if fields is None:
+            fields = declared(self.__models().get(name, cls))
+        fields = tuple(fields)
+        self.__index()  # Direct edits of __objects bump the version
+        stamp = (self.__objects, self.__version)
+        cached = self.__tables.get((name, fields))
+        if cached is not None and cached[0] is stamp[0] and \
+                cached[1] == stamp[1]:
+            return cached[2]
+        table = Table(name, fields, self.__project(cls, fields))
+        self.__tables[(name, fields)] = stamp + (table,)
+        return table
+
+    def get(self, cls, id):
+        """
+        Returns the model of type cls with the given id, building only that
+        model when it has not been loaded yet.
+
+        Args:
+            cls (class or str): The class (or class name) of the model
+            id (str): The id of the model
+
+        Returns:
+            The model, or None if there is no such model in storage
+        """
+        name = cls if isinstance(cls, str) else cls.__name__
+        key = f"{name}.{id}"
+        span = self.__pending.get(name, {}).get(key)
+        if span is not None:
+            self.__materialize({key: span})
+        return self.__objects.get(key)
+
+    def count(self, cls=None):
+        """
+        Returns the number of models of type cls in storage, from the size
+        of the class index, without building models that are not loaded.
+
+        Args:
+            cls (class or str): The class (or class name) to count, None to
+                count all models
+
+        Returns:
+            The number of models
+        """
+        pending = self.__pending
+        if cls is None:
+            return len(self.__objects) + sum(map(len, pending.values()))
+        if isinstance(cls, str):
+            names = [cls]
+        else:
+            names = [name for name, model in self.__models().items()
+                     if issubclass(model, cls)]
+        classes = self.__index()
+        return sum(len(classes.get(name, ())) + len(pending.get(name, ()))
+                   for name in names)
 
     def new(self, obj):
         """Adds new object to storage dictionary"""
-        key = obj.to_dict()['__class__'] + '.' + obj.id
-        self.all()[key] = obj
+        self.__writable()
+        name = type(obj).__name__
+        key = name + '.' + obj.id
+        self.__index()
+        self.__dirty.add(key)
+        self.__pending.get(name, {}).pop(key, None)
+        old = self.__objects.get(key)
+        if old is not obj:
+            if old is not None:
+                self.__unlink(key, old)
+            self.__objects[key] = obj
+            self.__link(key, obj)
+
+    def changed(self, obj, attr, old):
+        """
+        Marks a stored object as changed and keeps the reverse index in sync
+        when one of its foreign keys is reassigned.
+        Called by BaseModel.__setattr__.
+
+        Args:
+            obj (obj): The object that changed
+            attr (str): Name of the attribute that was set
+            old: Value of the attribute before it was set
+        """
+        name = type(obj).__name__
+        key = f"{name}.{getattr(obj, 'id', None)}"
+        if self.__objects.get(key) is not obj:  # Not (yet) in storage
+            return
+        self.__dirty.add(key)
+        self.__version += 1
+        if self.__holds_mutable(obj):
+            self.__mutable.add(key)
+        else:
+            self.__mutable.discard(key)
+        if attr not in self.__references.get(name, ()):
+            return
+        self.__index()
+        index = self.__related.setdefault((name, attr), {})
+        objs = index.get(old)
+        if objs is not None:
+            objs.pop(key, None)
+            if not objs:
+                del index[old]
+        index.setdefault(getattr(obj, attr), {})[key] = obj
 
     def save(self):
-        """Saves storage dictionary to file"""
-        with open(self.__file_path, 'w') as f:
-            temp = {}
-            temp.update(self.__objects)
-            for key, val in temp.items():
-                temp[key] = val.to_dict()
-            json.dump(temp, f)
+        """
+        Saves storage dictionary to file.
+        In journal mode only the changes since the last save are appended
+        to the journal, until it outgrows the compaction threshold.
+        Changes made in place to lists, dictionaries or sets are found by
+        serializing the objects holding them again.
+        """
+        self.__writable()
+        if self.__journal and not self.__rewrite:
+            self.__append()
+            try:
+                if os.path.getsize(self.__log_path()) > self.__journal_limit:
+                    self.compact()
+            except FileNotFoundError:  # Nothing was journaled yet
+                pass
+        else:
+            self.compact()
 
-    def reload(self):
-        """Loads storage dictionary from file"""
-        from models.base_model import BaseModel
-        from models.user import User
-        from models.place import Place
-        from models.state import State
-        from models.city import City
-        from models.amenity import Amenity
-        from models.review import Review
+    def bulk_new(self, objs):
+        """
+        Adds many objects to storage dictionary, to be written together by
+        bulk_save().
 
-        classes = {
-            'BaseModel': BaseModel, 'User': User, 'Place': Place,
-            'State': State, 'City': City, 'Amenity': Amenity,
-            'Review': Review
-        }
+        Args:
+            objs (iterable): The objects to add
+        """
+        for obj in objs:
+            self.new(obj)
+
+    def bulk_save(self):
+        """Writes the objects added by bulk_new() to file in one write"""
+        self.save()
+
+    def compact(self):
+        """
+        Writes every object to a new snapshot of the file, which replaces
+        the old one, and drops the journal it supersedes. Objects that were
+        never loaded are copied over from the old snapshot as they are.
+        """
+        self.__writable()
+        self.__index()  # Settles pending rewrites before they are cleared
+        self.__settle()
+        if self.__format == 'msgpack':
+            self.__dump_binary()
+        else:
+            self.__dump_json()
+        try:
+            os.remove(self.__log_path())
+        except FileNotFoundError:
+            pass
+        self.__stamp = self.__stat(self.__snapshot_path())
+        self.__log_position = (None, 0)
+        self.__dirty.clear()
+        self.__removed.clear()
+        self.__rewrite = False
+
+    def __dump_json(self):
+        """Writes the JSON snapshot, reusing the JSON of clean objects"""
+        fragments = self.__fragments
+        dirty = self.__dirty
+        temp_path = self.__file_path + '.tmp'
+        with open(temp_path, 'wb') as f:
+            f.write(b'{')
+            separator = b''
+            for key, obj in self.__objects.items():
+                cached = fragments.get(key)
+                if cached is None or cached[0] is not obj or key in dirty:
+                    cached = fragments[key] = (obj, self.__entry(key, obj))
+                f.write(separator)
+                f.write(cached[1])
+                separator = b', '
+            if any(self.__pending.values()):
+                # Copied from the file the spans were located in, which
+                # stays readable even if another process replaced it since
+                old = self.__source
+                for spans in self.__pending.values():
+                    for key, (start, end) in spans.items():
+                        old.seek(start)
+                        f.write(separator + json.dumps(key).encode() + b': ')
+                        spans[key] = (f.tell(), f.tell() + end - start)
+                        f.write(old.read(end - start))
+                        separator = b', '
+            f.write(b'}')
+        if any(self.__pending.values()):  # The spans are now in the new file
+            self.__open_source(temp_path)
+        os.replace(temp_path, self.__file_path)
+
+    def __dump_binary(self):
+        """Writes the binary snapshot"""
+        from models.engine import snapshot
+
+        self.__load(list(self.__pending))
+        temp_path = self.__binary_path() + '.tmp'
+        with open(temp_path, 'wb') as f:
+            snapshot.dump(((key, obj.to_dict())
+                           for key, obj in self.__objects.items()), f)
+        os.replace(temp_path, self.__binary_path())
+
+    def reload(self):
+        """
+        Loads storage dictionary from file, then replays its journal.
+        Large files are parsed one object at a time, so that only the
+        models, not a parsed copy of the whole file, are held in memory.
+        In lazy and mmap modes the models are not built, only located in
+        the file.
+        """
+        classes = self.__constructors()
+        stamp = self.__stat(self.__snapshot_path())
         try:
-            with open(self.__file_path, 'r') as f:
-                temp = json.load(f)
+            if self.__mmap:
+                self.__map()
+            elif self.__format == 'msgpack':
+                from models.engine import snapshot
+
+                # Every object built is kept, so garbage collections
+                # triggered by the allocations would only waste time
+                enabled = gc.isenabled()
+                gc.disable()
+                try:
+                    with open(self.__binary_path(), 'rb') as f:
+                        self.__index()
+                        for name, ids, values in snapshot.tables(f):
+                            build = classes[name]
+                            for id, val in zip(ids, values):
+                                self.__put(f"{name}.{id}", build(val))
+                finally:
+                    if enabled:
+                        gc.enable()
+            elif self.__lazy:
+                # Spans located in the previous file are stale, whether or
+                # not their keys are still in the new one
+                self.__pending.clear()
+                self.__version += 1
+                # latin-1 maps bytes to characters one to one, so the
+                # positions found by the parser are byte offsets
+                with open(self.__file_path, 'r', encoding='latin-1') as f:
+                    self.__open_source(f.fileno())
+                    self.__index()
+                    for key, val, start, end in _iter_members(f):
+                        old = self.__objects.pop(key, None)
+                        if old is not None:
+                            self.__unlink(key, old)
+                        spans = self.__pending.setdefault(val['__class__'], {})
+                        spans[key] = (start, end)
+                        self.__version += 1
+            elif os.path.getsize(self.__file_path) <= self.__stream_size:
+                with open(self.__file_path, 'rb') as f:
+                    temp = self.__codec.loads(f.read())
+                self.__index()
                 for key, val in temp.items():
-                    self.all()[key] = classes[val['__class__']](**val)
+                    self.__put(key, classes[val['__class__']](val))
+            else:
+                with open(self.__file_path, 'r', encoding='utf-8') as f:
+                    self.__index()
+                    for key, val, start, end in _iter_members(f):
+                        self.__put(key, classes[val['__class__']](val))
         except FileNotFoundError:
             pass
+        self.__stamp = stamp
+        self.__log_position = (None, 0)
+        self.__replay()
 
     def delete(self, obj=None):
         """
@@ -71,10 +558,381 @@ class FileStorage:
             obj (obj): object to delete
         """
         if obj:
-            key = f"{obj.__class__.__name__}.{obj.id}"
+            self.__writable()
+            key = f"{type(obj).__name__}.{obj.id}"
+            self.__index()
             del self.__objects[key]
+            self.__unlink(key, obj)
+            self.__removed.add(key)
         return
 
     def close(self):
-        """Calls reload() method for deserializing the JSON file to objects"""
-        self.reload()
+        """
+        Brings storage up to date with the file. The file is only parsed
+        again if it changed since it was loaded, otherwise only the new
+        records of the journal are replayed.
+        """
+        if self.__stat(self.__snapshot_path()) != self.__stamp or \
+                not self.__replay():
+            self.reload()
+
+    def __log_path(self):
+        """Returns the path of the journal that goes with the file"""
+        return self.__file_path + '.log'
+
+    def __binary_path(self):
+        """Returns the path of the binary snapshot that goes with the file"""
+        return os.path.splitext(self.__file_path)[0] + '.msgpack'
+
+    def __snapshot_path(self):
+        """Returns the path of the snapshot reload() reads"""
+        if self.__mmap or self.__format == 'msgpack':
+            return self.__binary_path()
+        return self.__file_path
+
+    @staticmethod
+    def __stat(path):
+        """Returns what tells whether the file at path changed, or None"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size, stat.st_mtime_ns
+
+    def __replay(self):
+        """
+        Replays the records appended to the journal since the last replay.
+
+        Returns:
+            False if the journal was truncated since, so that it can't be
+            replayed from where the last replay stopped, True otherwise
+        """
+        try:
+            f = open(self.__log_path(), 'rb')
+        except FileNotFoundError:
+            self.__log_position = (None, 0)
+            return True
+        with f:
+            stat = os.fstat(f.fileno())
+            inode, position = self.__log_position
+            if inode != stat.st_ino:
+                position = 0
+            elif stat.st_size < position:
+                return False
+            f.seek(position)
+            classes = self.__constructors()
+            self.__index()
+            for line in f:
+                if not line.endswith(b'\n'):  # Torn write at the end
+                    break
+                try:
+                    record = self.__codec.loads(line)
+                except ValueError:
+                    break
+                position += len(line)
+                key = record['key']
+                if record['op'] == 'put':
+                    val = record['value']
+                    self.__put(key, classes[val['__class__']](val))
+                elif key in self.__objects:
+                    self.__unlink(key, self.__objects.pop(key))
+                else:
+                    name = key.partition('.')[0]
+                    self.__pending.get(name, {}).pop(key, None)
+                    self.__version += 1
+            self.__log_position = (stat.st_ino, position)
+        return True
+
+    def __open_source(self, file):
+        """
+        Opens the file lazy spans locate records in, in place of the
+        previous one. Reading from an open file, rather than its path, keeps
+        the spans valid when another process replaces the file.
+
+        Args:
+            file (str or int): path of the file, or descriptor of it to
+                duplicate
+        """
+        if isinstance(file, int):
+            file = os.dup(file)
+        if self.__source is not None:
+            self.__source.close()
+        self.__source = open(file, 'rb')
+
+    def __writable(self):
+        """Raises PermissionError if storage is read-only"""
+        if self.__mmap:
+            raise PermissionError("File storage is read-only in mmap mode")
+
+    def __map(self):
+        """
+        Maps the binary snapshot into memory and locates its records.
+
+        Raises:
+            ValueError: If the file is empty or not a binary snapshot
+        """
+        import mmap
+        from array import array
+        from models.engine import snapshot
+
+        with open(self.__binary_path(), 'rb') as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header, body = snapshot.read_header(data)
+        except ValueError:
+            data.close()
+            raise
+        self.__index()
+        self.__pending.clear()  # Spans in the previous snapshot are stale
+        fields = {}
+        for name, table in header.items():
+            fields[name] = table['fields']
+            starts = snapshot.row_offsets(table)
+            ends = starts[1:] + array('Q', [table['end']])
+            spans = self.__pending[name] = {}
+            for id, start, end in zip(table['ids'], starts, ends):
+                key = f"{name}.{id}"
+                old = self.__objects.pop(key, None)
+                if old is not None:
+                    self.__unlink(key, old)
+                spans[key] = (body + start, body + end)
+        self.__version += 1
+        if self.__mapped is not None:
+            self.__mapped[0].close()
+        self.__mapped = (data, fields)
+
+    def __append(self):
+        """Appends the changes since the last save to the journal"""
+        self.__settle()
+        lines = []
+        for key in self.__removed:
+            if key not in self.__objects:
+                record = {'op': 'delete', 'key': key}
+                lines.append(self.__codec.dumps(record))
+        for key in self.__dirty:
+            obj = self.__objects.get(key)
+            if obj is not None:
+                key_json = json.dumps(key).encode()
+                value_json = self.__codec.dumps(obj.to_dict())
+                self.__fragments[key] = (obj, key_json + b': ' + value_json)
+                lines.append(b'{"op": "put", "key": ' + key_json +
+                             b', "value": ' + value_json + b'}')
+        if lines:
+            data = b'\n'.join(lines) + b'\n'
+            with open(self.__log_path(), 'ab') as f:
+                stat = os.fstat(f.fileno())
+                f.write(data)
+            inode, position = self.__log_position
+            if inode in (None, stat.st_ino) and stat.st_size == position:
+                # No one else appended since the last replay
+                self.__log_position = (stat.st_ino, position + len(data))
+        self.__dirty.clear()
+        self.__removed.clear()
+
+    def __entry(self, key, obj):
+        """Serializes obj as a `"<key>": {...}` member of the file object"""
+        return json.dumps(key).encode() + b': ' + \
+            self.__codec.dumps(obj.to_dict())
+
+    def __put(self, key, obj):
+        """Stores a freshly loaded object, replacing any previous one"""
+        self.__pending.get(type(obj).__name__, {}).pop(key, None)
+        old = self.__objects.get(key)
+        if old is not None:
+            self.__unlink(key, old)
+        self.__objects[key] = obj
+        self.__link(key, obj)
+
+    def __load(self, names):
+        """Builds the models of the given classes that are not loaded yet"""
+        for name in names:
+            spans = self.__pending.get(name)
+            if spans:
+                self.__materialize(spans.copy())
+
+    def __materialize(self, spans):
+        """
+        Builds the models of records of the file that are not loaded yet.
+
+        Args:
+            spans (dict): {<key>: (<start>, <end>)} byte ranges of the
+                records in the file, or in the mapped snapshot
+        """
+        classes = self.__constructors()
+        self.__index()
+        for key, val in self.__decode(spans):
+            self.__put(key, classes[val['__class__']](val))
+
+    def __decode(self, spans):
+        """
+        Decodes records of the file that are not loaded yet.
+
+        Args:
+            spans (dict): {<key>: (<start>, <end>)} byte ranges of the
+                records in the file, or in the mapped snapshot
+
+        Yields:
+            The (<key>, <to_dict() dictionary>) of each record
+        """
+        if self.__mmap:
+            from models.engine import snapshot
+
+            data, fields = self.__mapped
+            for key, (start, end) in spans.items():
+                name = key.partition('.')[0]
+                row = snapshot.unpack_row(data[start:end])
+                yield key, snapshot.record(name, fields[name], row)
+            return
+        f = self.__source
+        for key, (start, end) in spans.items():
+            f.seek(start)
+            yield key, self.__codec.loads(f.read(end - start))
+
+    def __project(self, cls, fields):
+        """
+        Returns records of the given attributes of the models of type cls.
+        Loaded models are read as they are; the others are decoded from
+        the file without building their models.
+
+        Args:
+            cls (class or str): The class (or class name), None for all
+            fields (tuple): Names of the attributes to project
+
+        Returns:
+            A dictionary of records: {<key>: <record>}
+        """
+        models = self.__models()
+        if cls is None:
+            names = list(models)
+        elif isinstance(cls, str):
+            names = [cls]
+        else:
+            names = [name for name, model in models.items()
+                     if issubclass(model, cls)]
+        classes = self.__index()
+        records = {}
+        for name in names:
+            record = record_type(name, fields)
+            for key, obj in classes.get(name, {}).items():
+                records[key] = record._make(getattr(obj, field, None)
+                                            for field in fields)
+            spans = self.__pending.get(name)
+            if not spans:
+                continue
+            model = models.get(name)
+            for key, val in self.__decode(spans.copy()):
+                values = []
+                for field in fields:
+                    if field not in val:  # Class attribute default
+                        values.append(getattr(model, field, None))
+                    elif field in ('created_at', 'updated_at'):
+                        values.append(datetime.fromisoformat(val[field]))
+                    else:
+                        values.append(val[field])
+                records[key] = record._make(values)
+        return records
+
+    def __models(self):
+        """Returns the model classes by name"""
+        from models.base_model import BaseModel
+        from models.user import User
+        from models.place import Place
+        from models.state import State
+        from models.city import City
+        from models.amenity import Amenity
+        from models.review import Review
+
+        return {
+            'BaseModel': BaseModel, 'User': User, 'Place': Place,
+            'State': State, 'City': City, 'Amenity': Amenity,
+            'Review': Review
+        }
+
+    def __constructors(self):
+        """
+        Returns the functions loaded objects are built from their records
+        with, by class name: the from_record() of the models, or of their
+        compact classes
+        """
+        models = self.__models()
+        if self.__compact:
+            from models.compact import compact
+
+            return {name: compact(model).from_record
+                    for name, model in models.items()}
+        return {name: model.from_record for name, model in models.items()}
+
+    @staticmethod
+    def __holds_mutable(obj):
+        """Tells whether obj holds a list, dictionary or set"""
+        return not _mutable_types.isdisjoint(map(type,
+                                                 obj.__dict__.values()))
+
+    def __settle(self):
+        """
+        Marks dirty the clean objects holding lists, dictionaries or sets
+        whose JSON is not cached, or changed since it was (the values were
+        changed in place).
+        """
+        fragments = self.__fragments
+        for key in self.__mutable - self.__dirty:
+            obj = self.__objects.get(key)
+            cached = fragments.get(key)
+            if obj is None:
+                continue
+            if cached is None or cached[0] is not obj or \
+                    cached[1] != self.__entry(key, obj):
+                self.__dirty.add(key)
+
+    def __link(self, key, obj):
+        """Adds obj to the class index and the reverse index"""
+        name = type(obj).__name__
+        self.__version += 1
+        self.__classes.setdefault(name, {})[key] = obj
+        if self.__holds_mutable(obj):
+            self.__mutable.add(key)
+        for attr in self.__references.get(name, ()):
+            index = self.__related.setdefault((name, attr), {})
+            index.setdefault(getattr(obj, attr), {})[key] = obj
+
+    def __unlink(self, key, obj):
+        """Removes obj from the class index and the reverse index"""
+        name = type(obj).__name__
+        self.__version += 1
+        self.__classes[name].pop(key, None)
+        self.__fragments.pop(key, None)
+        self.__mutable.discard(key)
+        for attr in self.__references.get(name, ()):
+            index = self.__related.get((name, attr), {})
+            value = getattr(obj, attr)
+            objs = index.get(value, {})
+            objs.pop(key, None)
+            if not objs:
+                index.pop(value, None)
+
+    def __index(self):
+        """
+        Makes sure the class and reverse indexes describe __objects.
+        They are rebuilt when __objects was replaced or edited directly
+        (e.g. `del storage.all()[key]`), which is detected by comparing the
+        identity and size of the dictionary they were built from. Such edits
+        bypass the journal, so the next save rewrites the whole file.
+
+        Returns:
+            The class index
+        """
+        objects = self.__objects
+        classes = self.__classes
+        if self.__indexed is not objects or \
+                sum(map(len, classes.values())) != len(objects):
+            self.__rewrite = self.__indexed is not None
+            self.__fragments = {key: cached for key, cached
+                                in self.__fragments.items()
+                                if objects.get(key) is cached[0]}
+            self.__classes = {}
+            self.__related = {}
+            self.__mutable = set()
+            self.__indexed = objects
+            for key, obj in objects.items():
+                self.__link(key, obj)
+        return self.__classes
@@ -0,0 +1,30 @@
+#!/usr/bin/python3
+"""
+This module defines the lightweight records storage engines return for
+projections, e.g. storage.all(Place, fields=['name', 'price_by_night']).
+
+Functions:
+    record_type: returns the record class of a projection
+
+Dependencies:
+    collections.namedtuple: slotted tuple classes with named fields
+"""
+from collections import namedtuple
+from functools import lru_cache
+
+
+@lru_cache(maxsize=None)
+def record_type(name, fields):
+    """
+    Returns the record class of a projection of a model class, a named
+    tuple, so records have no __dict__ of their own. The class is built
+    once per projection.
+
+    Args:
+        name (str): class name of the model, e.g. Place
+        fields (tuple): names of the projected attributes
+
+    Returns:
+        A named tuple class called <name>Record
+    """
+    return namedtuple(name + 'Record', fields)
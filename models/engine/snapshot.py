@@ -0,0 +1,283 @@
+#!/usr/bin/python3
+"""
+This module reads and writes the binary (msgpack) snapshot format of file
+storage, and converts snapshots between the JSON and binary formats.
+
+Usage: python3 -m models.engine.snapshot <source> <destination>
+       (the format of each file is given by its .json/.msgpack extension)
+
+Format:
+    b'HBNB\\x01'        magic number and format version
+    <header size>      8 bytes, little endian
+    <header>           msgpack map, one entry per class:
+                       {<class name>: {'fields': [<attribute name>, ...],
+                                       'ids': [<id>, ...],
+                                       'offsets': <uint64 array, little
+                                                   endian>,
+                                       'start': int, 'end': int}}
+    <body>             for each class, a msgpack array of rows
+
+    A row is the list of the object's values, in the order of the class'
+    field list, so attribute names are stored once per class. Rows may be
+    shorter than the field list, and missing values are stored as the
+    msgpack extension type 0. 'offsets' gives where each row starts and
+    'start'/'end' where the class' array lies, relative to the body.
+
+Functions:
+    dump: writes records to a binary snapshot
+    load: reads the records of a binary snapshot
+    tables: reads the records of a binary snapshot, class by class
+    read_header: parses the header of a binary snapshot
+    row_offsets: reads where the rows of a class start
+    unpack_row: unpacks rows of a binary snapshot
+    record: rebuilds the dictionary of an object from its row
+    convert: converts a snapshot between the JSON and binary formats
+
+Dependencies:
+    msgpack: binary serialization (optional for file storage as a whole)
+"""
+import gc
+import struct
+import sys
+from array import array
+from itertools import repeat
+import msgpack
+
+MAGIC = b'HBNB\x01'
+_SIZE = struct.Struct('<Q')
+_MISSING_EXT = msgpack.ExtType(0, b'')  # How missing values are packed
+
+
+class _Missing:
+    """Type of the value unpacked for fields a row doesn't have"""
+
+
+MISSING = _Missing()
+
+
+def _ext_hook(code, data):
+    """Unpacks the missing value extension type"""
+    if code == 0:
+        return MISSING
+    return msgpack.ExtType(code, data)
+
+
+def dump(records, f):
+    """
+    Writes records to a binary snapshot.
+
+    Args:
+        records: iterable of (<key>, <to_dict() dictionary>) pairs
+        f (file): file opened for binary writing
+    """
+    classes = {}
+    pack = msgpack.Packer().pack
+    for key, record in records:
+        name = record['__class__']
+        table = classes.get(name)
+        if table is None:
+            table = classes[name] = {'fields': [], 'positions': {},
+                                     'ids': [], 'rows': []}
+        fields = table['fields']
+        positions = table['positions']
+        row = [_MISSING_EXT] * len(fields)
+        for field, value in record.items():
+            if field == '__class__':
+                continue
+            position = positions.get(field)
+            if position is None:
+                position = positions[field] = len(fields)
+                fields.append(field)
+                row.append(value)
+            else:
+                row[position] = value
+        table['ids'].append(key.partition('.')[2])
+        table['rows'].append(pack(row))
+
+    header = {}
+    position = 0
+    for name, table in classes.items():
+        offsets = array('Q')
+        start = position
+        position += len(_array_header(len(table['rows'])))
+        for row in table['rows']:
+            offsets.append(position)
+            position += len(row)
+        if sys.byteorder == 'big':
+            offsets.byteswap()
+        header[name] = {'fields': table['fields'], 'ids': table['ids'],
+                        'offsets': offsets.tobytes(),
+                        'start': start, 'end': position}
+    header = pack(header)
+    f.write(MAGIC + _SIZE.pack(len(header)) + header)
+    for table in classes.values():
+        f.write(_array_header(len(table['rows'])))
+        f.writelines(table['rows'])
+
+
+def row_offsets(table):
+    """
+    Returns where the rows of a class start, relative to the body.
+
+    Args:
+        table (dict): the class' entry in the header
+
+    Returns:
+        array: uint64 offsets, in the machine's byte order
+    """
+    offsets = array('Q', table['offsets'])
+    if sys.byteorder == 'big':
+        offsets.byteswap()
+    return offsets
+
+
+def read_header(data):
+    """
+    Parses the header of a binary snapshot.
+
+    Args:
+        data (bytes-like): the snapshot, or at least its header
+
+    Returns:
+        (header, body) where body is the position of the body in data
+
+    Raises:
+        ValueError: If data is not a binary snapshot
+    """
+    if bytes(data[:len(MAGIC)]) != MAGIC:
+        raise ValueError("Not an hbnb binary snapshot")
+    start = len(MAGIC) + _SIZE.size
+    size, = _SIZE.unpack(data[len(MAGIC):start])
+    header = msgpack.unpackb(data[start:start + size])
+    return header, start + size
+
+
+def unpack_row(data):
+    """Unpacks a row (or array of rows) of a binary snapshot"""
+    return msgpack.unpackb(data, ext_hook=_ext_hook)
+
+
+def record(name, fields, row):
+    """
+    Rebuilds the to_dict() dictionary of an object from its row.
+
+    Args:
+        name (str): class name of the object
+        fields (list): field list of the class
+        row (list): values of the object
+    """
+    values = dict(zip(fields, row))
+    if MISSING in row:
+        values = {field: value for field, value in values.items()
+                  if value is not MISSING}
+    values['__class__'] = name
+    return values
+
+
+def tables(f):
+    """
+    Reads the records of a binary snapshot, class by class. The rows of a
+    class are unpacked in one call, and only scanned for missing values
+    if the unpacker met any. The garbage collector is paused meanwhile:
+    the lists and dictionaries unpacked would otherwise trigger many
+    collections, which find no garbage and took most of the time.
+
+    Args:
+        f (file): file opened for binary reading
+
+    Yields:
+        (<class name>, <ids>, <records>) for each class, where records is
+        the list of the to_dict() dictionaries of its objects, without
+        their __class__
+    """
+    data = memoryview(f.read())
+    header, body = read_header(data)
+    for name, table in header.items():
+        missing = []
+
+        def ext_hook(code, data):
+            """Unpacks extension types, noting missing values"""
+            value = _ext_hook(code, data)
+            if value is MISSING:
+                missing.append(value)
+            return value
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            rows = msgpack.unpackb(
+                data[body + table['start']:body + table['end']],
+                ext_hook=ext_hook)
+            records = list(map(dict, map(zip, repeat(table['fields']),
+                                         rows)))
+        finally:
+            if enabled:
+                gc.enable()
+        if missing:
+            records = [{field: value for field, value in values.items()
+                        if value is not MISSING} for values in records]
+        yield name, table['ids'], records
+
+
+def load(f):
+    """
+    Reads the records of a binary snapshot.
+
+    Args:
+        f (file): file opened for binary reading
+
+    Yields:
+        (<key>, <to_dict() dictionary>) pairs, grouped by class
+    """
+    for name, ids, records in tables(f):
+        for id, values in zip(ids, records):
+            values['__class__'] = name
+            yield f"{name}.{id}", values
+
+
+def _array_header(length):
+    """Returns the msgpack header of an array of the given length"""
+    if length < 16:
+        return bytes([0x90 | length])
+    if length < 2 ** 16:
+        return b'\xdc' + struct.pack('>H', length)
+    return b'\xdd' + struct.pack('>I', length)
+
+
+def convert(source, destination):
+    """
+    Converts a snapshot between the JSON and binary formats.
+    The format of each file is given by its extension, .json or .msgpack.
+
+    Args:
+        source (str): path of the snapshot to read
+        destination (str): path of the snapshot to write
+    """
+    from models.engine.codec import get_codec
+    from models.engine.file_storage import _iter_members
+
+    if source.endswith('.msgpack'):
+        src = open(source, 'rb')
+        records = load(src)
+    else:
+        src = open(source, 'r', encoding='utf-8')
+        records = ((key, value) for key, value, start, end
+                   in _iter_members(src))
+    with src, open(destination, 'wb') as f:
+        if destination.endswith('.msgpack'):
+            dump(records, f)
+        else:
+            dumps = get_codec().dumps
+            f.write(b'{')
+            separator = b''
+            for key, value in records:
+                f.write(separator + dumps(key) + b': ' + dumps(value))
+                separator = b', '
+            f.write(b'}')
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python3 -m models.engine.snapshot "
+              "<source> <destination>", file=sys.stderr)
+        sys.exit(1)
+    convert(sys.argv[1], sys.argv[2])
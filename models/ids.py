@@ -0,0 +1,107 @@
+#!/usr/bin/python3
+"""
+This module defines the generators of the ids of new models, one of which
+is selected with HBNB_ID_GENERATOR. Each returns a new UUID string in the
+canonical form, e.g. '2c5d3f1e-8a4b-4c6d-9e7f-0a1b2c3d4e5f'.
+
+Generators:
+    uuid4: random UUIDs from uuid.uuid4, one os.urandom() call each
+        (the default)
+    batched: random (version 4) UUIDs sliced from random bytes read in
+        batches, for creating many models at once
+    uuid7: time-ordered (version 7) UUIDs, which sort by creation time, so
+        rows inserted in mysql append to the primary key index instead of
+        landing all over it
+
+Functions:
+    available: names of the generators
+    get_generator: returns a generator by name
+
+Dependencies:
+    os.urandom: random bytes
+    uuid: uuid4 generator
+"""
+import os
+import time
+import uuid
+from collections import deque
+from threading import Lock
+
+_batch_size = 4096  # Random ids read per os.urandom() call
+_random = deque()  # Random 32 digit hexadecimal strings not used yet
+_clock = [0, 0]  # [<ms of the last uuid7>, <its sequence number in the ms>]
+_clock_lock = Lock()
+
+
+def _random_hex():
+    """Returns 32 random hexadecimal digits, refilling the batch if empty"""
+    try:
+        return _random.popleft()
+    except IndexError:
+        digits = os.urandom(16 * _batch_size).hex()
+        _random.extend(digits[i:i + 32] for i in range(0, len(digits), 32))
+        return _random.popleft()
+
+
+# A child process must not hand out the same ids as its parent
+os.register_at_fork(after_in_child=_random.clear)
+
+
+def _uuid4():
+    """Returns a random UUID from uuid.uuid4"""
+    return str(uuid.uuid4())
+
+
+def _batched():
+    """Returns a random (version 4) UUID from the batch of random bytes"""
+    h = _random_hex()
+    variant = '89ab'[int(h[16], 16) & 3]
+    return f"{h[:8]}-{h[8:12]}-4{h[13:16]}-{variant}{h[17:20]}-{h[20:]}"
+
+
+def _uuid7():
+    """
+    Returns a time-ordered (version 7) UUID: 48 bits of Unix time in
+    milliseconds, a 12 bit sequence number, then 62 random bits. The
+    sequence orders the ids of a millisecond; when it runs out (or the
+    clock goes back), the time of the last id is carried on instead.
+    """
+    now = time.time_ns() // 1000000
+    with _clock_lock:
+        if now > _clock[0]:
+            _clock[0], _clock[1] = now, 0
+        elif _clock[1] < 0xfff:
+            _clock[1] += 1
+        else:
+            _clock[0], _clock[1] = _clock[0] + 1, 0
+        ms, sequence = _clock
+    t = f"{ms:012x}"
+    h = _random_hex()
+    variant = '89ab'[int(h[0], 16) & 3]
+    return f"{t[:8]}-{t[8:]}-7{sequence:03x}-{variant}{h[1:4]}-{h[4:16]}"
+
+
+_generators = {'uuid4': _uuid4, 'batched': _batched, 'uuid7': _uuid7}
+
+
+def available():
+    """Returns the names of the generators"""
+    return list(_generators)
+
+
+def get_generator(name=None):
+    """
+    Returns an id generator.
+
+    Args:
+        name (str): uuid4, batched or uuid7. If None or empty, uuid4 is
+            returned.
+
+    Raises:
+        ValueError: If name is not a known generator
+    """
+    if not name:
+        return _uuid4
+    if name not in _generators:
+        raise ValueError(f"Unknown id generator: {name}")
+    return _generators[name]
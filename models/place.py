@@ -16,6 +16,7 @@ from models.base_model import BaseModel, Base, storage_type
 from models.review import Review
 from models.amenity import Amenity
 from sqlalchemy import Column, Integer, String, Float, ForeignKey, Table
+from sqlalchemy import Index
 from sqlalchemy.orm import relationship
 import models
 
@@ -58,9 +59,12 @@ class Place(BaseModel, Base):
     """
     if storage_type == "db":
         __tablename__ = "places"
+        # Serves the places of a city, sorted by name
+        __table_args__ = (Index("ix_places_city_id_name", "city_id", "name"),)
         city_id = Column(String(60), ForeignKey("cities.id"), nullable=False)
-        user_id = Column(String(60), ForeignKey("users.id"), nullable=False)
-        name = Column(String(128), nullable=False)
+        user_id = Column(String(60), ForeignKey("users.id"), nullable=False,
+                         index=True)
+        name = Column(String(128), nullable=False, index=True)
         description = Column(String(1024), nullable=True)
         number_rooms = Column(Integer, default=0, nullable=False)
         number_bathrooms = Column(Integer, default=0, nullable=False)
@@ -94,11 +98,8 @@ class Place(BaseModel, Base):
                 A list of Review objects with place_id equal to the current
                 Place.id.
             """
-            review_list = []
-            for review in models.storage.all(Review).values():
-                if review.place_id == self.id:
-                    review_list.append(review)
-            return review_list
+            reviews = models.storage.related(Review, "place_id", self.id)
+            return list(reviews.values())
 
         @property
         def amenities(self):
@@ -109,9 +110,11 @@ class Place(BaseModel, Base):
                 A list of Amenity objects with place_id equal to the current
                 Place.id.
             """
+            amenities = models.storage.all(Amenity)  # Keyed by Amenity.<id>
             amenity_list = []
-            for amenity in models.storage.all(Amenity).values():
-                if amenity.id in self.amenity_ids:
+            for amenity_id in dict.fromkeys(self.amenity_ids):
+                amenity = amenities.get("Amenity." + amenity_id)
+                if amenity is not None:
                     amenity_list.append(amenity)
             return amenity_list
 
@@ -123,5 +126,7 @@ class Place(BaseModel, Base):
             Args:
                 obj: An Amenity object.
             """
-            if type(obj) == Amenity:
-                self.amenity_ids.append(obj.id)
+            if isinstance(obj, Amenity):
+                # Reassigned rather than appended, so that storage sees the
+                # change and the class-level default list stays untouched
+                self.amenity_ids = self.amenity_ids + [obj.id]
@@ -14,7 +14,7 @@ class State(BaseModel, Base):
     """
     if storage_type == "db":
         __tablename__ = "states"
-        name = Column(String(128), nullable=False)
+        name = Column(String(128), nullable=False, index=True)
         cities = relationship("City", backref="state", cascade="all, delete")
     else:
         name = ""
@@ -27,9 +27,5 @@ class State(BaseModel, Base):
             current State.id
             """
             from models import storage  # Import here to avoid circular import
-            from models.city import City
-            cities = []  # List of City instances
-            for city in storage.all(City).values():  # Loop through all cities
-                if city.state_id == self.id:  # If city.state_id == State.id
-                    cities.append(city)  # Add city to list
-            return cities  # Return list of City instances
+            # Served from the state_id reverse index instead of a full scan
+            return list(storage.related("City", "state_id", self.id).values())
@@ -0,0 +1,19 @@
+-- setup_mysql_indexes.sql
+-- Adds the indexes declared by the models to tables created before them.
+-- New databases get them when the tables are created, so this is only
+-- run once on existing ones, e.g.:
+--     cat setup_mysql_indexes.sql | mysql -uroot -p hbnb_dev_db
+
+-- States, amenities and places pages sort by name
+CREATE INDEX ix_states_name ON states (name);
+CREATE INDEX ix_amenities_name ON amenities (name);
+CREATE INDEX ix_places_name ON places (name);
+
+-- Cities of a state and places of a city, sorted by name
+CREATE INDEX ix_cities_state_id_name ON cities (state_id, name);
+CREATE INDEX ix_places_city_id_name ON places (city_id, name);
+
+-- Places and reviews of a user, reviews of a place
+CREATE INDEX ix_places_user_id ON places (user_id);
+CREATE INDEX ix_reviews_place_id ON reviews (place_id);
+CREATE INDEX ix_reviews_user_id ON reviews (user_id);
@@ -93,6 +93,30 @@ class test_basemodel(unittest.TestCase):
         new = self.value()
         self.assertEqual(type(new.updated_at), datetime.datetime)
 
+    @unittest.skipIf(storageType == "db", "Not for alchemy")
+    def test_from_record(self):
+        """ from_record builds the same model as kwargs do """
+        i = self.value()
+        record = i.to_dict()
+        new = self.value.from_record(i.to_dict())
+        self.assertIs(type(new), self.value)
+        self.assertEqual(new.to_dict(), record)
+        self.assertEqual(str(new), str(self.value(**record)))
+        self.assertEqual(new.created_at, i.created_at)
+
+    @unittest.skipIf(storageType == "db", "Not for alchemy")
+    def test_from_record_lazy_timestamps(self):
+        """ Timestamps of records are parsed when first read """
+        i = self.value()
+        new = self.value.from_record(i.to_dict())
+        self.assertIs(type(new.__dict__['updated_at']), str)
+        self.assertEqual(new.updated_at, i.updated_at)
+        self.assertIsInstance(new.__dict__['updated_at'], datetime.datetime)
+        self.assertEqual(str(new), str(self.value(**i.to_dict())))
+        self.assertEqual(new.to_dict(), i.to_dict())
+        new.updated_at = datetime.datetime(2017, 9, 28, 21, 3, 54)
+        self.assertEqual(new.to_dict()['updated_at'], "2017-09-28T21:03:54")
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+""" Module for testing the compact model classes """
+import unittest
+from os import getenv
+from models.place import Place
+from models.review import Review
+
+
+@unittest.skipIf(getenv("HBNB_TYPE_STORAGE") == "db",
+                 "compact classes are for file storage")
+class test_compact(unittest.TestCase):
+    """ Class to test the compact (slotted) model classes """
+
+    def setUp(self):
+        """ Builds a place and its compact copy """
+        from models.compact import compact
+        self.place = Place(name="Loft", city_id="c", number_rooms=2)
+        self.copy = compact(Place)(**self.place.to_dict())
+
+    def test_same_output(self):
+        """ __str__ and to_dict() are those of the model """
+        self.assertEqual(str(self.copy), str(self.place))
+        self.assertEqual(list(self.copy.to_dict().items()),
+                         list(self.place.to_dict().items()))
+
+    def test_class(self):
+        """ The compact class is a model subclass of the same name """
+        self.assertIsInstance(self.copy, Place)
+        self.assertEqual(type(self.copy).__name__, "Place")
+
+    def test_defaults(self):
+        """ Unset fields read as the class defaults """
+        self.assertEqual(self.copy.max_guest, 0)
+        self.assertEqual(self.copy.amenity_ids, [])
+        self.assertEqual(self.copy.reviews, [])
+        with self.assertRaises(AttributeError):
+            self.copy.missing
+
+    def test_shape(self):
+        """ Objects set in the same order share their shape """
+        from models.compact import compact
+        other = compact(Place)(**self.place.to_dict())
+        self.assertIs(other._shape, self.copy._shape)
+
+    def test_property_setter(self):
+        """ Properties are set through their setter, outside the shape """
+        import json
+        from models.amenity import Amenity
+        amenity = Amenity(name="Wifi")
+        self.copy.amenities = amenity
+        self.assertNotIn('amenities', self.copy._shape)
+        self.assertEqual(self.copy.amenity_ids, [amenity.id])
+        self.assertEqual(json.loads(json.dumps(self.copy.to_dict())),
+                         self.copy.to_dict())
+
+    def test_undeclared_attribute(self):
+        """ Attributes the model doesn't declare are kept, in order """
+        self.copy.color = "blue"
+        self.place.color = "blue"
+        self.assertEqual(str(self.copy), str(self.place))
+        del self.copy.color
+        self.assertNotIn('color', self.copy.to_dict())
+
+    def test_interned_foreign_keys(self):
+        """ Foreign keys are interned """
+        from models.compact import compact
+        place_id = "".join(["place", "-", "1"])
+        review = compact(Review)(place_id=place_id)
+        self.assertIs(review.place_id, compact(Review)(
+            place_id="".join(["place", "-", "1"])).place_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,42 @@
+#!/usr/bin/python3
+"""Test module for async_db_storage"""
+import unittest
+from os import getenv
+from models.engine.async_db_storage import AsyncDBStorage
+
+
+class test_async_db_storage(unittest.IsolatedAsyncioTestCase):
+    """Class to test the async_db_storage method"""
+
+    def test_doc(self):
+        """
+        Check all the doc of the AsyncDBStorage Class
+        """
+        for method in (AsyncDBStorage, AsyncDBStorage.__init__,
+                       AsyncDBStorage.all, AsyncDBStorage.get,
+                       AsyncDBStorage.new, AsyncDBStorage.save,
+                       AsyncDBStorage.delete, AsyncDBStorage.reload,
+                       AsyncDBStorage.bootstrap, AsyncDBStorage.close):
+            self.assertGreater(len(method.__doc__), 0)
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'asyncdb',
+                     "not asyncdb storage")
+    async def test_save_get_delete(self):
+        """Objects are saved, fetched and deleted by awaiting storage"""
+        from models import storage
+        from models.state import State
+        await storage.bootstrap()
+        state = State(name="Vermont")
+        await state.save()
+        await storage.close()
+        fetched = await storage.get(State, state.id)
+        self.assertEqual(fetched.name, "Vermont")
+        self.assertIn('State.' + state.id, await storage.all("State"))
+        await storage.delete(fetched)
+        await storage.save()
+        self.assertIsNone(await storage.get(State, state.id))
+        await storage.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+"""Test module for the JSON codecs of file storage"""
+import unittest
+from datetime import datetime
+from models.engine import codec
+
+
+class test_codec(unittest.TestCase):
+    """Class to test the codec module"""
+
+    def test_available(self):
+        """The standard library codec is always available"""
+        self.assertIn('json', codec.available())
+        self.assertEqual(codec.get_codec().name, codec.available()[0])
+
+    def test_round_trip(self):
+        """Every available codec reads back what it writes"""
+        data = {'State.1': {'name': 'Zürich', 'number': 1, 'ratio': 0.5,
+                            'ids': ['a', 'b'], 'none': None}}
+        for name in codec.available():
+            json_codec = codec.get_codec(name)
+            dumped = json_codec.dumps(data)
+            self.assertIsInstance(dumped, bytes)
+            self.assertEqual(json_codec.loads(dumped), data)
+            self.assertEqual(json_codec.loads(dumped.decode()), data)
+
+    def test_large_integers(self):
+        """Integers over 64 bits are written and read back exactly"""
+        data = {'Place.1': {'number_rooms': 123456789012345678901234567890,
+                            'max_guest': -2 ** 64, 'name': 'Loft'}}
+        for name in codec.available():
+            json_codec = codec.get_codec(name)
+            dumped = json_codec.dumps(data)
+            self.assertEqual(json_codec.loads(dumped), data)
+            self.assertEqual(json_codec.loads(dumped.decode()), data)
+
+    def test_datetime(self):
+        """Datetime objects are written in ISO format"""
+        for value in (datetime(2017, 9, 28, 21, 3, 54, 52298),
+                      datetime(2017, 9, 28, 21, 3, 54)):
+            for name in codec.available():
+                dumped = codec.get_codec(name).dumps({'at': value})
+                self.assertEqual(codec.get_codec(name).loads(dumped),
+                                 {'at': value.isoformat()})
+
+    def test_unknown(self):
+        """Unknown codecs are rejected"""
+        with self.assertRaises(ValueError):
+            codec.get_codec('yaml')
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+#!/usr/bin/python3
+"""Test module for the columnar tables of file storage"""
+import unittest
+from array import array
+from models.engine.columns import Table
+
+
+class test_columns(unittest.TestCase):
+    """Class to test the columns module"""
+
+    def setUp(self):
+        """Builds a table of three places"""
+        fields = ('city_id', 'price_by_night', 'latitude', 'amenity_ids')
+        self.table = Table('Place', fields, {
+            'Place.1': ('c1', 80, 1.5, []),
+            'Place.2': ('c2', 120, 2, ['a']),
+            'Place.3': ('c1', 100, None, [])
+        })
+
+    def test_storage(self):
+        """Numbers are kept in typed arrays, other values encoded once"""
+        table = self.table
+        self.assertEqual(len(table), 3)
+        self.assertIsInstance(table['price_by_night'], array)
+        self.assertEqual(table['price_by_night'].typecode, 'q')
+        self.assertEqual(table['city_id'].values, ['c1', 'c2'])
+        self.assertEqual(list(table['city_id']), ['c1', 'c2', 'c1'])
+        self.assertEqual(list(table['latitude']), [1.5, 2, None])
+        self.assertEqual(table['amenity_ids'][1], ['a'])
+
+    def test_filters(self):
+        """Filters return the positions of the matching rows"""
+        table = self.table
+        self.assertEqual(table.where('city_id', 'c1'), [0, 2])
+        self.assertEqual(table.where('city_id', 'c9'), [])
+        self.assertEqual(table.where('price_by_night', 120), [1])
+        self.assertEqual(table.between('price_by_night', 90), [1, 2])
+        in_c1 = table.where('city_id', 'c1')
+        self.assertEqual(table.between('price_by_night', high=90,
+                                       rows=in_c1), [0])
+
+    def test_aggregates(self):
+        """Aggregates run over all rows, or the given ones"""
+        table = self.table
+        self.assertEqual(table.sum('price_by_night'), 300)
+        self.assertEqual(table.mean('price_by_night',
+                                    table.where('city_id', 'c1')), 90)
+        self.assertEqual(table.min('price_by_night'), 80)
+        self.assertEqual(table.max('price_by_night', [0, 2]), 100)
+        self.assertIsNone(table.mean('price_by_night', []))
+        self.assertEqual(table.count_by('city_id'), {'c1': 2, 'c2': 1})
+        self.assertEqual(table.count_by('price_by_night', [0]), {80: 1})
+
+    def test_unhashable_values(self):
+        """Lists get one code per distinct value, and can be counted"""
+        table = Table('Place', ('tag', 'amenity_ids'), {
+            'Place.1': ('x', []),
+            'Place.2': ([], ['a']),
+            'Place.3': ('x', []),
+            'Place.4': ('x', ['a'])
+        })
+        self.assertEqual(table['tag'].values, ['x', []])
+        self.assertEqual(table['amenity_ids'].values, [[], ['a']])
+        self.assertEqual(table.where('tag', 'x'), [0, 2, 3])
+        self.assertEqual(table.where('amenity_ids', ['a']), [1, 3])
+        self.assertEqual(table.count_by('amenity_ids'), {(): 2, ('a',): 2})
+        self.assertEqual(table.count_by('tag', [1, 2]), {(): 1, 'x': 1})
+        self.assertEqual(table.count_by('amenity_ids', [0]), {(): 1})
+
+    def test_types_distinct(self):
+        """Equal values of different types keep their types"""
+        table = Table('Place', ('value',), {
+            'Place.1': (1,), 'Place.2': (True,), 'Place.3': ('1',)
+        })
+        self.assertEqual([type(value) for value in table['value']],
+                         [int, bool, str])
+        self.assertEqual(table.where('value', 1), [0, 1])
+
+    def test_rows(self):
+        """Rows read their fields from the columns"""
+        row = self.table.rows([1])[0]
+        self.assertEqual((row.city_id, row.price_by_night), ('c2', 120))
+        self.assertEqual(repr(row), "<Place row Place.2>")
+        with self.assertRaises(AttributeError):
+            row.name
+        self.assertEqual(len(self.table.rows()), 3)
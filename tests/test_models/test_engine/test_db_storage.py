@@ -1,6 +1,7 @@
 #!/usr/bin/python3
 """Test module for db_storage"""
 import unittest
+from os import getenv
 from models.engine.db_storage import DBStorage
 
 
@@ -37,6 +38,205 @@ class test_db_storage(unittest.TestCase):
         module_class = len(DBStorage.__init__.__doc__)
         self.assertGreater(module_class, 0)
 
+    def test_pool_options(self):
+        """Pool counts are integers, the timeout may be fractional"""
+        from unittest import mock
+        from models.engine.db_storage import pool_options
+
+        env = {'HBNB_MYSQL_POOL_SIZE': '8', 'HBNB_MYSQL_POOL_TIMEOUT': '2.5'}
+        with mock.patch.dict('os.environ', env):
+            options = pool_options()
+        self.assertEqual(options['pool_size'], 8)
+        self.assertIsInstance(options['pool_size'], int)
+        self.assertEqual(options['pool_timeout'], 2.5)
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_all_concurrently(self):
+        """all() returns every class, attached to the current session"""
+        from models import storage
+        from models.state import State
+        from models.city import City
+        state = State(name="California")
+        storage.new(state)
+        storage.save()
+        city = City(name="Fremont", state_id=state.id)
+        storage.new(city)
+        storage.save()
+        objects = storage.all()
+        self.assertIs(objects['State.' + state.id], state)
+        self.assertIs(objects['City.' + city.id], city)
+        storage.close()
+        objects = storage.all()
+        self.assertEqual(objects['City.' + city.id].state.id, state.id)
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_all_pool_busy(self):
+        """all() leaves a pooled connection to the session, and reads the
+        tables sequentially while another all()'s workers run"""
+        from unittest import mock
+        from models import storage
+        from models.state import State
+        state = State(name="Oregon")
+        storage.new(state)
+        storage.save()
+        self.assertEqual(storage._DBStorage__workers, 4)  # Pool of 5
+        with storage._DBStorage__fetching, \
+                mock.patch('models.engine.db_storage.ThreadPoolExecutor') \
+                as executor:
+            objects = storage.all()
+        executor.assert_not_called()
+        self.assertIs(objects['State.' + state.id], state)
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_query_load(self):
+        """Relationships named in load don't issue a query per object"""
+        from sqlalchemy import event
+        from models import storage
+        from models.state import State
+        from models.city import City
+        for name in ("Alabama", "Arizona"):
+            state = State(name=name)
+            storage.new(state)
+            storage.new(City(name="Capital", state_id=state.id))
+        storage.save()
+        storage.close()
+        states = storage.query(State, order_by='name', load=['cities'])
+        statements = []
+        engine = storage._DBStorage__engine
+        listener = (lambda *args: statements.append(args[2]))
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            self.assertEqual([len(state.cities) for state in states[:2]],
+                             [1, 1])
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        self.assertEqual(statements, [])
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_close_keeps_factory(self):
+        """close() only returns the session, without rebuilding storage"""
+        from models import storage
+        factory = storage._DBStorage__factory
+        session = storage._DBStorage__session()
+        storage.close()
+        self.assertIs(storage._DBStorage__factory, factory)
+        self.assertIsNot(storage._DBStorage__session(), session)
+        size = getenv('HBNB_MYSQL_POOL_SIZE')
+        if size:
+            engine = storage._DBStorage__engine
+            self.assertEqual(engine.pool.size(), int(size))
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_reload_skips_schema(self):
+        """Tables are only created once, reload() only starts a session"""
+        from sqlalchemy import event
+        from models import storage
+        statements = []
+        engine = storage._DBStorage__engine
+        listener = (lambda *args: statements.append(args[2]))
+        event.listen(engine, 'before_cursor_execute', listener)
+        try:
+            storage.reload()
+            storage.bootstrap()
+        finally:
+            event.remove(engine, 'before_cursor_execute', listener)
+        self.assertEqual(statements, [])
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_bulk_save(self):
+        """Queued objects are inserted, then updated, in bulk"""
+        from models import storage
+        from models.state import State
+        states = [State(name="Bulk {}".format(i)) for i in range(3)]
+        storage.bulk_new(states)
+        storage.bulk_save()
+        from sqlalchemy import event
+        statements = []
+        engine = storage._DBStorage__engine
+
+        def count(conn, cursor, statement, *args):
+            """Records the UPDATE statements"""
+            if statement.startswith("UPDATE"):
+                statements.append(statement)
+        event.listen(engine, 'before_cursor_execute', count)
+        try:
+            for state in states:
+                state.name = state.name + " renamed"
+            states[0].name = "Bulk renamed"
+            storage.bulk_new(states)
+            storage.bulk_save()
+        finally:
+            event.remove(engine, 'before_cursor_execute', count)
+        self.assertEqual(len(statements), 1)  # One executemany, no flush
+        storage.close()
+        names = [state.name for state
+                 in storage.query(State, where={'id': states[0].id})]
+        self.assertEqual(names, ["Bulk renamed"])
+        for state in states:
+            self.assertIsNotNone(storage.all(State).get('State.' + state.id))
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_all_fields(self):
+        """Projections select the given columns into records"""
+        from models import storage
+        from models.state import State
+        state = State(name="Oregon")
+        storage.new(state)
+        storage.save()
+        records = storage.all(State, fields=['name'])
+        self.assertEqual(tuple(records['State.' + state.id]), ("Oregon",))
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_listing_indexes(self):
+        """The listing queries are served by indexes, without sorting"""
+        from sqlalchemy import select
+        from models import storage
+        from models.state import State
+        from models.city import City
+        from models.place import Place
+        for name in ("Texas", "Utah", "Maine"):
+            state = State(name=name)
+            storage.new(state)
+            storage.new(City(name="City of " + name, state_id=state.id))
+        storage.save()
+        engine = storage._DBStorage__engine
+        queries = {
+            'ix_states_name': select(State).order_by(State.name).limit(10),
+            'ix_cities_state_id_name':
+                select(City).filter_by(state_id=state.id).order_by(City.name),
+            'ix_places_city_id_name':
+                select(Place).filter_by(city_id="x").order_by(Place.name)
+        }
+        for index, statement in queries.items():
+            sql = str(statement.compile(
+                engine, compile_kwargs={'literal_binds': True}))
+            with engine.connect() as connection:
+                if engine.dialect.name == 'sqlite':
+                    plan = ' '.join(row[-1] for row in connection
+                                    .exec_driver_sql('EXPLAIN QUERY PLAN ' +
+                                                     sql))
+                else:
+                    plan = ' '.join(f"{row.key} {row.Extra}" for row
+                                    in connection.exec_driver_sql('EXPLAIN ' +
+                                                                  sql))
+            self.assertIn(index, plan)
+            self.assertNotIn('filesort', plan)
+            self.assertNotIn('TEMP B-TREE', plan)
+
+    @unittest.skipIf(getenv('HBNB_TYPE_STORAGE') != 'db', "not db storage")
+    def test_get_count(self):
+        """get() looks objects up by id, count() counts them"""
+        from models import storage
+        from models.state import State
+        count = storage.count(State)
+        state = State(name="Idaho")
+        storage.new(state)
+        storage.save()
+        self.assertIs(storage.get(State, state.id), state)
+        self.assertIsNone(storage.get("State", "missing"))
+        self.assertEqual(storage.count("State"), count + 1)
+        self.assertEqual(storage.count("BaseModel"), 0)
+
 
 if __name__ == "__main__":
     unittest.main()
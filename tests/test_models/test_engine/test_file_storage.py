@@ -1,6 +1,8 @@
 #!/usr/bin/python3
 """ Module for testing file storage"""
+import json
 import unittest
+import unittest.mock
 from models.base_model import BaseModel
 from models import storage
 import os
@@ -19,10 +21,16 @@ class test_fileStorage(unittest.TestCase):
 
     def tearDown(self):
         """ Remove storage file at end of tests """
-        try:
-            os.remove('file.json')
-        except Exception:
-            pass
+        storage._FileStorage__journal = False
+        storage._FileStorage__lazy = False
+        storage._FileStorage__mmap = False
+        storage._FileStorage__pending.clear()
+        storage._FileStorage__format = 'json'
+        for path in ('file.json', 'file.json.log', 'file.msgpack'):
+            try:
+                os.remove(path)
+            except Exception:
+                pass
 
     def test_obj_list_empty(self):
         """ __objects is initially empty """
@@ -76,6 +84,109 @@ class test_fileStorage(unittest.TestCase):
         with self.assertRaises(ValueError):
             storage.reload()
 
+    def test_reload_large(self):
+        """ Files past the stream size are streamed on reload """
+        new = BaseModel()
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__stream_size = 0
+        try:
+            storage.reload()
+        finally:
+            del storage._FileStorage__stream_size
+        self.assertEqual(storage.get(BaseModel, new.id).to_dict(),
+                         new.to_dict())
+
+    def test_binary_format(self):
+        """ Binary snapshots are saved and reloaded """
+        try:
+            import msgpack
+        except ImportError:
+            self.skipTest("msgpack is not installed")
+        from models.state import State
+        new = State()
+        new.name = "Nevada"
+        storage._FileStorage__format = 'msgpack'
+        storage.save()
+        self.assertFalse(os.path.exists('file.json'))
+        storage.all().clear()
+        storage.reload()
+        self.assertEqual(storage.get(State, new.id).to_dict(),
+                         new.to_dict())
+
+    def test_mmap_read_only(self):
+        """ Mapped snapshots are decoded on demand and can't be written """
+        try:
+            import msgpack
+        except ImportError:
+            self.skipTest("msgpack is not installed")
+        from models.state import State
+        from models.city import City
+        state = State(name="Nevada")
+        city = City(name="Reno", state_id=state.id)
+        storage.new(state)
+        storage.new(city)
+        storage._FileStorage__format = 'msgpack'
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__mmap = True
+        storage.reload()
+        self.assertEqual(len(storage._FileStorage__objects), 0)
+        self.assertEqual(storage.get(State, state.id).to_dict(),
+                         state.to_dict())
+        self.assertEqual(len(storage._FileStorage__objects), 1)
+        self.assertEqual(list(storage.related(City, 'state_id', state.id)),
+                         ['City.' + city.id])
+        with self.assertRaises(PermissionError):
+            State()
+        with self.assertRaises(PermissionError):
+            storage.save()
+        with self.assertRaises(PermissionError):
+            storage.delete(storage.get(State, state.id))
+        self.assertEqual(len(storage.all()), 2)
+
+    def test_mmap_new_snapshot(self):
+        """ Spans of a replaced snapshot are dropped when it is mapped """
+        try:
+            import msgpack
+        except ImportError:
+            self.skipTest("msgpack is not installed")
+        from models.engine import snapshot
+        from models.state import State
+        states = [State() for _ in range(3)]
+        for i, state in enumerate(states):
+            state.name = f"State {i}"
+        storage._FileStorage__format = 'msgpack'
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__mmap = True
+        storage.reload()
+        with open('file.msgpack.tmp', 'wb') as f:  # Another process
+            snapshot.dump([('State.' + states[2].id, states[2].to_dict())],
+                          f)
+        os.replace('file.msgpack.tmp', 'file.msgpack')
+        storage.close()
+        self.assertIsNone(storage.get(State, states[0].id))
+        self.assertEqual(list(storage.all(State)), ['State.' + states[2].id])
+        self.assertEqual(storage.get(State, states[2].id).to_dict(),
+                         states[2].to_dict())
+
+    def test_reload_streamed(self):
+        """ The file is parsed incrementally, member by member """
+        from io import StringIO
+        from models.engine.file_storage import _iter_members
+        data = {'State.1': {'name': '}, "'}, 'State.2': {'ids': [1, {}]}}
+        text = json.dumps(data, indent=4)
+        for size in (1, 5, 1024):
+            members = list(_iter_members(StringIO(text), size))
+            self.assertEqual([member[:2] for member in members],
+                             list(data.items()))
+            for key, val, start, end in members:
+                self.assertEqual(json.loads(text[start:end]), val)
+        for text in ('[]', '{"State.1": {}', '{"State.1" {}}'):
+            with self.assertRaises(ValueError):
+                list(_iter_members(StringIO(text), 4))
+
     def test_reload_from_nonexistent(self):
         """ Nothing happens if file does not exist """
         self.assertEqual(storage.reload(), None)
@@ -102,6 +213,424 @@ class test_fileStorage(unittest.TestCase):
             temp = key
         self.assertEqual(temp, 'BaseModel' + '.' + _id)
 
+    def test_all_cls(self):
+        """ all(cls) only returns instances of cls """
+        from models.state import State
+        state = State()
+        new = BaseModel()
+        states = storage.all(State)
+        self.assertEqual(list(states.keys()), ['State.' + state.id])
+        self.assertEqual(len(storage.all(BaseModel)), 2)
+
+    def test_all_cls_name(self):
+        """ all() accepts a class name """
+        from models.state import State
+        state = State()
+        self.assertIs(storage.all('State')['State.' + state.id], state)
+
+    def test_all_cls_read_only(self):
+        """ all(cls) returns a read-only view """
+        from models.state import State
+        state = State()
+        with self.assertRaises(TypeError):
+            storage.all(State)['State.x'] = state
+
+    def test_all_cls_after_delete(self):
+        """ Deleted objects leave the class index """
+        from models.state import State
+        state = State()
+        storage.delete(state)
+        self.assertEqual(len(storage.all(State)), 0)
+        state = State()
+        del storage.all()['State.' + state.id]
+        self.assertEqual(len(storage.all(State)), 0)
+
+    def test_related(self):
+        """ Reverse index returns the cities of a state """
+        from models.city import City
+        from models.state import State
+        state = State()
+        city = City()
+        city.state_id = state.id
+        other = City()
+        self.assertEqual(list(storage.related(City, 'state_id', state.id)),
+                         ['City.' + city.id])
+        self.assertEqual(state.cities, [city])
+
+    def test_related_follows_setattr(self):
+        """ Reassigning a foreign key moves the object in the index """
+        from models.city import City
+        from models.state import State
+        first = State()
+        second = State()
+        city = City()
+        city.state_id = first.id
+        city.state_id = second.id
+        self.assertEqual(first.cities, [])
+        self.assertEqual(second.cities, [city])
+        storage.delete(city)
+        self.assertEqual(second.cities, [])
+
+    def test_related_leaves_default(self):
+        """ Setting an unset foreign key moves the object out of "" """
+        from models.city import City
+        from models.state import State
+        state = State()
+        city = City()
+        self.assertEqual(list(storage.related(City, 'state_id', '')),
+                         ['City.' + city.id])
+        city.state_id = state.id
+        self.assertEqual(len(storage.related(City, 'state_id', '')), 0)
+        self.assertEqual(storage.query(City, where={'state_id': ''}), [])
+        storage.delete(city)
+        self.assertEqual(len(storage.related(City, 'state_id', state.id)),
+                         0)
+
+    def test_related_place(self):
+        """ Place.reviews and Place.amenities use the indexes """
+        from models.amenity import Amenity
+        from models.place import Place
+        from models.review import Review
+        place = Place()
+        review = Review()
+        review.place_id = place.id
+        amenity = Amenity()
+        place.amenity_ids = [amenity.id, 'missing']
+        self.assertEqual(place.reviews, [review])
+        self.assertEqual(place.amenities, [amenity])
+
+    def test_count(self):
+        """ Count uses the index sizes, without loading lazy models """
+        from models.state import State
+        State()
+        State()
+        BaseModel()
+        self.assertEqual(storage.count(State), 2)
+        self.assertEqual(storage.count("BaseModel"), 1)
+        self.assertEqual(storage.count(BaseModel), 3)
+        self.assertEqual(storage.count(), 3)
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        self.assertEqual(storage.count("State"), 2)
+        self.assertEqual(len(storage._FileStorage__objects), 0)
+
+    def test_query(self):
+        """ Query filters, sorts and paginates the models of a class """
+        from models.city import City
+        from models.state import State
+        state = State()
+        cities = [City(name=name, state_id=state.id) for name in "bdac"]
+        for city in cities:
+            storage.new(city)
+        storage.new(City(name="e"))
+        names = [city.name for city
+                 in storage.query(City, where={'state_id': state.id},
+                                  order_by='name')]
+        self.assertEqual(names, ['a', 'b', 'c', 'd'])
+        names = [city.name for city
+                 in storage.query("City", order_by='-name', limit=2,
+                                  offset=1)]
+        self.assertEqual(names, ['d', 'c'])
+        self.assertEqual(storage.query(City, where={'name': 'a'}),
+                         [cities[2]])
+        self.assertEqual(storage.query(City, limit=0), [])
+
+    def test_bulk_save(self):
+        """ Objects added in bulk are written in a single save """
+        from models.place import Place
+        places = [Place(name=str(i)) for i in range(3)]
+        with unittest.mock.patch.object(storage, 'save',
+                                        wraps=storage.save) as save:
+            storage.bulk_new(places)
+            storage.bulk_save()
+        save.assert_called_once_with()
+        storage.all().clear()
+        storage.reload()
+        self.assertEqual(len(storage.all(Place)), 3)
+
+    def test_save_reuses_clean_objects(self):
+        """ Only dirty objects are serialized again on save """
+        clean = BaseModel()
+        dirty = BaseModel()
+        storage.save()
+        clean.__dict__['name'] = "untracked"
+        dirty.name = "tracked"
+        storage.save()
+        with open('file.json') as f:
+            j = json.load(f)
+        self.assertNotIn('name', j['BaseModel.' + clean.id])
+        self.assertEqual(j['BaseModel.' + dirty.id], dirty.to_dict())
+
+    def test_save_in_place_changes(self):
+        """ Lists changed in place are saved, journaled or not """
+        from models.place import Place
+        place = Place()
+        place.amenity_ids = ['a1']
+        storage.save()
+        for journal in (False, True):
+            storage._FileStorage__journal = journal
+            place.amenity_ids.append('a2')
+            storage.save()
+            storage.all().clear()
+            storage.reload()
+            self.assertEqual(storage.get(Place, place.id).amenity_ids,
+                             place.amenity_ids)
+            place = storage.get(Place, place.id)
+
+    def test_save_deleted_attribute(self):
+        """ Deleted attributes are gone from the file after a save """
+        from models.state import State
+        for compact in (False, True):
+            storage._FileStorage__compact = compact
+            state = State()
+            state.name = "Ohio"
+            storage.save()
+            storage.all().clear()
+            storage.reload()
+            state = storage.get(State, state.id)
+            storage.save()  # Caches the JSON of the state
+            del state.name
+            storage.save()
+            storage.all().clear()
+            storage.reload()
+            self.assertNotIn('name', storage.get(State, state.id).to_dict())
+        storage._FileStorage__compact = False
+
+    def test_lazy_reload(self):
+        """ Lazy reload builds models on first access """
+        from models.state import State
+        from models.city import City
+        state = State()
+        city = City()
+        city.state_id = state.id
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        self.assertEqual(len(storage._FileStorage__objects), 0)
+        loaded = storage.get(State, state.id)
+        self.assertEqual(loaded.to_dict(), state.to_dict())
+        self.assertEqual(len(storage._FileStorage__objects), 1)
+        self.assertEqual([c.id for c in loaded.cities], [city.id])
+        self.assertEqual(len(storage.all()), 2)
+
+    def test_all_fields(self):
+        """ Projections return records, without building lazy models """
+        from models.place import Place
+        place = Place(name="Loft", price_by_night=120)
+        storage.new(place)
+        key = 'Place.' + place.id
+        records = storage.all(Place, fields=['name', 'price_by_night'])
+        self.assertEqual(tuple(records[key]), ("Loft", 120))
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        records = storage.all("Place", fields=['name', 'max_guest',
+                                               'created_at'])
+        self.assertEqual(records[key].name, "Loft")
+        self.assertEqual(records[key].max_guest, 0)
+        self.assertEqual(records[key].created_at, place.created_at)
+        self.assertEqual(len(storage._FileStorage__objects), 0)
+
+    def test_columns(self):
+        """ Columnar tables follow changes, without building lazy models """
+        from models.place import Place
+        cheap = Place(city_id="c1", price_by_night=50)
+        dear = Place(city_id="c1", price_by_night=150)
+        storage.bulk_new([cheap, dear])
+        table = storage.columns(Place)
+        self.assertIs(storage.columns(Place), table)
+        self.assertEqual(table.mean('price_by_night'), 100)
+        self.assertEqual(table.count_by('city_id'), {"c1": 2})
+        self.assertEqual(table.count_by('amenity_ids'), {(): 2})
+        dear.price_by_night = 250
+        self.assertEqual(storage.columns(Place).max('price_by_night'), 250)
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        table = storage.columns("Place", fields=['id', 'price_by_night'])
+        rows = table.rows(table.between('price_by_night', high=100))
+        self.assertEqual([row.id for row in rows], [cheap.id])
+        self.assertEqual(len(storage._FileStorage__objects), 0)
+        self.assertEqual(rows[0].model().to_dict(), cheap.to_dict())
+
+    def test_compact_reload(self):
+        """ Compact mode loads objects with the slotted classes """
+        from models.place import Place
+        place = Place(name="Loft")
+        storage.new(place)
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__compact = True
+        try:
+            storage.reload()
+        finally:
+            storage._FileStorage__compact = False
+        loaded = storage.get(Place, place.id)
+        self.assertIsNot(type(loaded), Place)
+        self.assertEqual(str(loaded), str(place))
+        loaded.name = "Attic"
+        storage.save()
+        storage.all().clear()
+        storage.reload()
+        self.assertEqual(storage.get(Place, place.id).name, "Attic")
+
+    def test_lazy_save(self):
+        """ Unloaded objects are carried over by save """
+        from models.state import State
+        first = State()
+        second = State()
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        loaded = storage.get('State', first.id)
+        loaded.name = "Loaded"
+        storage.save()
+        self.assertEqual(storage._FileStorage__pending['State'],
+                         {'State.' + second.id: unittest.mock.ANY})
+        with open('file.json') as f:
+            j = json.load(f)
+        self.assertEqual(j['State.' + first.id]['name'], "Loaded")
+        self.assertEqual(j['State.' + second.id], second.to_dict())
+        self.assertEqual(storage.get(State, second.id).to_dict(),
+                         second.to_dict())
+
+    def test_lazy_close_rewritten(self):
+        """ Lazy reload drops the spans of a file that was rewritten """
+        from models.state import State
+        states = [State() for _ in range(3)]
+        for i, state in enumerate(states):
+            state.name = f"State {i}"
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        with open('file.json') as f:  # Another process deletes a State
+            j = json.load(f)
+        del j['State.' + states[0].id]
+        with open('file.json', 'w') as f:
+            json.dump(j, f, indent=4)
+        storage.close()
+        self.assertIsNone(storage.get(State, states[0].id))
+        self.assertEqual(sorted(state.name
+                                for state in storage.all(State).values()),
+                         ["State 1", "State 2"])
+        self.assertEqual(storage.get(State, states[2].id).to_dict(),
+                         states[2].to_dict())
+
+    def test_lazy_save_after_replace(self):
+        """ Lazy saves copy unloaded records from the file they were
+        located in, even after another process replaced it """
+        import subprocess
+        import sys
+        import models
+        from models.state import State
+        states = [State() for _ in range(5)]
+        storage.save()
+        storage.all().clear()
+        storage._FileStorage__lazy = True
+        storage.reload()
+        env = dict(os.environ)
+        for name in ('HBNB_FILE_LAZY', 'HBNB_FILE_JOURNAL', 'HBNB_FILE_MMAP'):
+            env.pop(name, None)
+        env['PYTHONPATH'] = os.path.dirname(os.path.dirname(models.__file__))
+        subprocess.run([sys.executable, '-c',  # Another process renames one
+                        "from models import storage\n"
+                        "state = storage.get('State', %r)\n"
+                        "state.name = 'A much longer name than before'\n"
+                        "storage.save()\n" % states[0].id],
+                       env=env, check=True)
+        new = State()
+        storage.save()
+        with open('file.json') as f:
+            j = json.load(f)
+        self.assertEqual(set(j), {'State.' + state.id
+                                  for state in states + [new]})
+        self.assertEqual(j['State.' + states[1].id], states[1].to_dict())
+
+    def test_journal_append(self):
+        """ Journal mode appends changes instead of rewriting the file """
+        storage._FileStorage__journal = True
+        storage.compact()
+        size = os.path.getsize('file.json')
+        first = BaseModel()
+        storage.save()
+        self.assertEqual(os.path.getsize('file.json'), size)
+        second = BaseModel()
+        first.name = "changed"
+        storage.delete(second)
+        storage.save()
+        with open('file.json.log') as f:
+            lines = f.read().splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertIn('"changed"', lines[-1])
+
+    def test_journal_reload(self):
+        """ Reload replays the journal on top of the snapshot """
+        storage._FileStorage__journal = True
+        kept = BaseModel()
+        gone = BaseModel()
+        storage.compact()
+        kept.name = "journaled"
+        storage.delete(gone)
+        storage.save()
+        storage.all().clear()
+        storage.reload()
+        self.assertEqual(list(storage.all()), ['BaseModel.' + kept.id])
+        self.assertEqual(storage.all()['BaseModel.' + kept.id].name,
+                         "journaled")
+
+    def test_journal_compaction(self):
+        """ The journal is folded into the snapshot past its limit """
+        storage._FileStorage__journal = True
+        storage._FileStorage__journal_limit = 0
+        try:
+            new = BaseModel()
+            storage.save()
+        finally:
+            del storage._FileStorage__journal_limit
+        self.assertFalse(os.path.exists('file.json.log'))
+        with open('file.json') as f:
+            self.assertIn('BaseModel.' + new.id, f.read())
+
+    def test_close_unchanged(self):
+        """ Close only parses the file again when it changed """
+        new = BaseModel()
+        storage.save()
+        storage.close()
+        self.assertIs(storage.all()['BaseModel.' + new.id], new)
+        with open('file.json') as f:
+            data = json.load(f)
+        data['BaseModel.' + new.id]['name'] = "outside"
+        with open('file.json.tmp', 'w') as f:
+            json.dump(data, f)
+        os.replace('file.json.tmp', 'file.json')
+        storage.close()
+        self.assertEqual(storage.all()['BaseModel.' + new.id].name,
+                         "outside")
+
+    def test_close_journal_delta(self):
+        """ Close replays only the records appended to the journal """
+        storage._FileStorage__journal = True
+        first = BaseModel()
+        storage.compact()
+        storage.close()
+        second = BaseModel()
+        storage.save()
+        record = {'op': 'put', 'key': 'BaseModel.' + first.id,
+                  'value': dict(first.to_dict(), name="outside")}
+        with open('file.json.log', 'a') as f:
+            f.write(json.dumps(record) + '\n')
+        storage.close()
+        self.assertIs(storage.all()['BaseModel.' + second.id], second)
+        self.assertEqual(storage.all()['BaseModel.' + first.id].name,
+                         "outside")
+
     def test_storage_var_created(self):
         """ FileStorage object storage created """
         from models.engine.file_storage import FileStorage
@@ -0,0 +1,90 @@
+#!/usr/bin/python3
+"""Test module for the binary snapshot format of file storage"""
+import json
+import os
+import unittest
+from io import BytesIO
+
+try:
+    from models.engine import snapshot
+except ImportError:
+    snapshot = None
+
+
+@unittest.skipIf(snapshot is None, "msgpack is not installed")
+class test_snapshot(unittest.TestCase):
+    """Class to test the snapshot module"""
+
+    records = [
+        ('State.1', {'id': '1', 'name': 'California', '__class__': 'State'}),
+        ('City.2', {'id': '2', 'state_id': '1', '__class__': 'City'}),
+        ('State.3', {'id': '3', 'extra': [1, None], '__class__': 'State'}),
+        ('State.4', {'name': None, 'id': '4', '__class__': 'State'}),
+    ]
+
+    def tearDown(self):
+        """Remove converted files"""
+        for path in ('snapshot.json', 'snapshot.msgpack', 'back.json'):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def test_round_trip(self):
+        """Records read back equal the records written"""
+        f = BytesIO()
+        snapshot.dump(self.records, f)
+        f.seek(0)
+        self.assertEqual(dict(snapshot.load(f)), dict(self.records))
+
+    def test_fields_shared(self):
+        """Field names are stored once per class"""
+        f = BytesIO()
+        snapshot.dump(self.records, f)
+        header, body = snapshot.read_header(f.getvalue())
+        self.assertEqual(header['State']['fields'], ['id', 'name', 'extra'])
+        self.assertEqual(header['State']['ids'], ['1', '3', '4'])
+        self.assertEqual(f.getvalue().count(b'name'), 1)
+
+    def test_row_offsets(self):
+        """Rows can be decoded on their own from their offsets"""
+        f = BytesIO()
+        snapshot.dump(self.records, f)
+        data = f.getvalue()
+        header, body = snapshot.read_header(data)
+        table = header['State']
+        offsets = snapshot.row_offsets(table)
+        row = snapshot.unpack_row(data[body + offsets[1]:body + offsets[2]])
+        self.assertEqual(snapshot.record('State', table['fields'], row),
+                         dict(self.records)['State.3'])
+
+    def test_offsets_little_endian(self):
+        """Row offsets are little endian whatever the machine's byte
+        order, so snapshots can be moved between machines"""
+        import struct
+        f = BytesIO()
+        snapshot.dump(self.records, f)
+        header, body = snapshot.read_header(f.getvalue())
+        table = header['State']
+        offsets = snapshot.row_offsets(table)
+        self.assertEqual(table['offsets'],
+                         struct.pack(f'<{len(offsets)}Q', *offsets))
+        self.assertTrue(offsets[0] < offsets[1] < offsets[2])
+
+    def test_not_a_snapshot(self):
+        """Other files are rejected"""
+        with self.assertRaises(ValueError):
+            list(snapshot.load(BytesIO(b'{"State.1": {}}')))
+
+    def test_convert(self):
+        """Snapshots convert from JSON to binary and back"""
+        with open('snapshot.json', 'w') as f:
+            json.dump(dict(self.records), f)
+        snapshot.convert('snapshot.json', 'snapshot.msgpack')
+        snapshot.convert('snapshot.msgpack', 'back.json')
+        with open('back.json') as f:
+            self.assertEqual(json.load(f), dict(self.records))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+"""Test module for the id generators of the models"""
+import unittest
+from uuid import UUID
+from models import ids
+
+
+class test_ids(unittest.TestCase):
+    """Class to test the ids module"""
+
+    def test_format(self):
+        """Every generator returns canonical UUID strings"""
+        for name, version in (('uuid4', 4), ('batched', 4), ('uuid7', 7)):
+            generator = ids.get_generator(name)
+            for _ in range(100):
+                id = generator()
+                uuid = UUID(id)
+                self.assertEqual(str(uuid), id)
+                self.assertEqual(uuid.version, version)
+                self.assertEqual(uuid.variant, 'specified in RFC 4122')
+
+    def test_unique(self):
+        """Generators don't repeat ids, across batches too"""
+        for name in ids.available():
+            generator = ids.get_generator(name)
+            count = 3 * ids._batch_size
+            self.assertEqual(len({generator() for _ in range(count)}), count)
+
+    def test_uuid7_ordered(self):
+        """Time-ordered ids sort in creation order"""
+        generator = ids.get_generator('uuid7')
+        created = [generator() for _ in range(10000)]
+        self.assertEqual(sorted(created), created)
+
+    def test_get_generator(self):
+        """uuid4 is the default, unknown generators are rejected"""
+        self.assertIs(ids.get_generator(), ids.get_generator('uuid4'))
+        self.assertIs(ids.get_generator(''), ids.get_generator('uuid4'))
+        with self.assertRaises(ValueError):
+            ids.get_generator('serial')
@@ -3,7 +3,9 @@
 from tests.test_models.test_base_model import test_basemodel
 from models.place import Place
 from models.review import Review
+from models.amenity import Amenity
 from os import getenv
+import unittest
 
 storageType = getenv("HBNB_TYPE_STORAGE")
 
@@ -103,6 +105,16 @@ class test_Place(test_basemodel):
         if storageType == "file":
             self.assertEqual(type(new.amenity_ids), list)
 
+    @unittest.skipIf(storageType == "db", "Not for alchemy")
+    def test_amenities_setter(self):
+        """ Linking an amenity only affects that place """
+        new = self.value()
+        other = self.value()
+        amenity = Amenity()
+        new.amenities = amenity
+        self.assertEqual(new.amenity_ids, [amenity.id])
+        self.assertEqual(other.amenity_ids, [])
+
 
 if __name__ == "__main__":
     unittest.main()
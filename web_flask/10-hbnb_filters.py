@@ -23,8 +23,8 @@ def statesList():
     """
     list all states an amenities
     """
-    states = sorted(list(storage.all("State").values()), key=lambda x: x.name)
-    am = sorted(list(storage.all("Amenity").values()), key=lambda x: x.name)
+    states = storage.query("State", order_by="name", load=["cities"])
+    am = storage.query("Amenity", order_by="name")
     return render_template('10-hbnb_filters.html', states=states, amenities=am)
 
 
@@ -23,9 +23,9 @@ def statesList():
     """
     Render template for all hbnb
     """
-    states = sorted(list(storage.all("State").values()), key=lambda x: x.name)
-    amenities = sorted(list(storage.all("Amenity").values()), key=lambda x: x.name)
-    places = sorted(list(storage.all("Place").values()), key=lambda x: x.name)
+    states = storage.query("State", order_by="name", load=["cities"])
+    amenities = storage.query("Amenity", order_by="name")
+    places = storage.query("Place", order_by="name", load=["user"])
     print(places)
     return render_template('100-hbnb.html', states=states, amenities= amenities, places=places)
 
@@ -23,7 +23,7 @@ def statesList():
     """
     list all states
     """
-    states = sorted(list(storage.all("State").values()), key=lambda x: x.name)
+    states = storage.query("State", order_by="name")
     return render_template('7-states_list.html', states=states)
 
 
@@ -23,7 +23,7 @@ def statesList():
     """
     list all states
     """
-    states = sorted(list(storage.all("State").values()), key=lambda x: x.name)
+    states = storage.query("State", order_by="name", load=["cities"])
     return render_template('8-cities_by_states.html', states=states)
 
 
@@ -5,7 +5,6 @@ List all States through an end point
 """
 
 from flask import Flask, render_template
-from models import State
 from models import storage
 from markupsafe import escape
 from models.state import State
@@ -26,7 +25,7 @@ def statesList():
     """
     list all states
     """
-    states = storage.all(State)
+    states = storage.query(State, order_by="name")
     return render_template('9-states.html', states=states, choice=True)
 
 
@@ -35,10 +34,8 @@ def statesCityList(id):
     """
     list all states an cities
     """
-    for state in storage.all(State).values():
-        if state.id == id:
-            return render_template('9-states.html', states=state, choice=False)
-    return render_template('9-states.html', states=False, choice=False)
+    state = storage.get(State, id)  # Primary key lookup
+    return render_template('9-states.html', states=state, choice=False)
 
 
 if __name__ == '__main__':